@@ -1,7 +1,12 @@
 import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
 
+from bank_loans.loans.tests.factories import CustomerFactory
+from bank_loans.loans.tests.factories import PersonnelFactory
 from bank_loans.users.models import User
 from bank_loans.users.tests.factories import UserFactory
+from config import auth
 
 
 @pytest.fixture(autouse=True)
@@ -9,6 +14,36 @@ def _media_storage(settings, tmpdir) -> None:
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+    auth.local_cache.clear()
+
+
 @pytest.fixture
 def user(db) -> User:
     return UserFactory()
+
+
+@pytest.fixture
+def customer(db) -> User:
+    return CustomerFactory()
+
+
+@pytest.fixture
+def personnel(db) -> User:
+    return PersonnelFactory()
+
+
+@pytest.fixture
+def customer_client(customer) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(customer)
+    return client
+
+
+@pytest.fixture
+def personnel_client(personnel) -> APIClient:
+    client = APIClient()
+    client.force_authenticate(personnel)
+    return client
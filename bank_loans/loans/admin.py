@@ -1,16 +1,22 @@
 from django.contrib import admin
 from django.contrib.sites.models import Site
 
+from .counts import ApproximateCountPaginator
 from .models import BankBudget
+from .models import BudgetEntry
+from .models import BudgetSnapshot
 from .models import Document
 from .models import Fund
 from .models import Loan
 from .models import LoanPayment
 from .models import LoanRequest
+from .models import StatusCounter
 
 
 @admin.register(Loan)
 class LoanAdmin(admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
     list_display = (
         "customer",
         "amount",
@@ -47,6 +53,8 @@ class LoanAdmin(admin.ModelAdmin):
 
 @admin.register(LoanPayment)
 class LoanPaymentAdmin(admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
     list_display = ("loan", "amount_paid", "payment_date")
     list_filter = ("payment_date",)
     search_fields = ("loan__customer__username", "loan__customer__email")
@@ -59,7 +67,28 @@ class LoanPaymentAdmin(admin.ModelAdmin):
 
 @admin.register(BankBudget)
 class BankBudgetAdmin(admin.ModelAdmin):
-    list_display = ("total_funds",)
+    list_display = ("id", "available_funds")
+
+
+@admin.register(BudgetEntry)
+class BudgetEntryAdmin(admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    list_display = ("id", "kind", "amount", "fund", "loan", "created_at")
+    list_filter = ("kind", "created_at")
+    readonly_fields = ("kind", "amount", "fund", "loan", "created_at")
+
+
+@admin.register(BudgetSnapshot)
+class BudgetSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("last_entry_id", "balance", "created_at")
+    readonly_fields = ("last_entry_id", "balance", "created_at")
+
+
+@admin.register(StatusCounter)
+class StatusCounterAdmin(admin.ModelAdmin):
+    list_display = ("kind", "status", "count")
+    readonly_fields = ("kind", "status", "count")
 
 
 @admin.register(Fund)
@@ -86,6 +115,8 @@ class DocumentAdmin(admin.ModelAdmin):
 
 @admin.register(LoanRequest)
 class LoanRequestAdmin(admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
     list_display = (
         "customer",
         "status",
@@ -98,6 +129,10 @@ class LoanRequestAdmin(admin.ModelAdmin):
     search_fields = ("customer__username", "customer__email")
     readonly_fields = ("customer", "created_at", "updated_at")
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return queryset.filter(LoanRequest.search_filter(search_term)), False
 
 
 admin.site.unregister(Site)
@@ -4,12 +4,14 @@ from decimal import Decimal
 from rest_framework.serializers import ModelSerializer
 from bank_loans.loans.models import (
     BankBudget,
+    BudgetEntry,
     Document,
     Fund,
     Loan,
     LoanPayment,
     LoanRequest,
 )
+from bank_loans.loans.imports import FORMATS
 from rest_framework import serializers
 
 logger = logging.getLogger(__name__)
@@ -30,9 +32,7 @@ class FundSerializer(ModelSerializer):
         if not success:
             raise Exception("Failed to send funds to the bank.")
 
-        bank_budget, _ = BankBudget.objects.get_or_create(id=1)
-        bank_budget.add_funds(fund.amount)
-        bank_budget.save()
+        BankBudget.get_instance().add_funds(fund.amount, fund=fund)
 
         return fund
 
@@ -70,9 +70,55 @@ class DocumentSerializer(serializers.ModelSerializer):
         return value
 
 
-class LoanRequestSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Restrict GET representations to ``?fields=a,b`` (``id`` is always kept).
+
+    Relations listed in ``expandable_fields`` are only nested in a sparse
+    representation when named in ``fields`` or ``?expand=``. Without
+    ``fields`` the full representation is returned.
+    """
+
+    expandable_fields = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+
+        selected = self.get_selected_fields(request.query_params)
+        if selected is not None:
+            for name in list(self.fields):
+                if name not in selected:
+                    self.fields.pop(name)
+
+    def get_selected_fields(self, query_params):
+        fields = query_params.get("fields")
+        if not fields:
+            return None
+
+        fields = {name.strip() for name in fields.split(",") if name.strip()}
+        expand = query_params.get("expand", "")
+        expand = {name.strip() for name in expand.split(",") if name.strip()}
+
+        unknown = fields - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": f"Unknown fields: {', '.join(sorted(unknown))}."}
+            )
+        unknown = expand - set(self.expandable_fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {"expand": f"Cannot expand: {', '.join(sorted(unknown))}."}
+            )
+        return {"id"} | fields | expand
+
+
+class LoanRequestSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     secured = serializers.BooleanField(required=True)
     documents = DocumentSerializer(many=True, required=False)
+    expandable_fields = ["documents"]
 
     class Meta:
         model = LoanRequest
@@ -131,6 +177,58 @@ class LoanRequestSettingsSerializer(serializers.ModelSerializer):
         return data
 
 
+class BulkLoanRequestSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        # Primary keys are bigints.
+        child=serializers.IntegerField(min_value=1, max_value=2**63 - 1),
+        allow_empty=False,
+        max_length=5000,
+    )
+
+
+class BatchIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        # Primary keys are bigints.
+        child=serializers.IntegerField(min_value=1, max_value=2**63 - 1),
+        allow_empty=False,
+        max_length=200,
+    )
+
+
+class PaymentImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=FORMATS, required=False)
+    batch_size = serializers.IntegerField(
+        min_value=1, max_value=10000, required=False, default=1000
+    )
+
+
+class LoanRequestSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=2, max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=200, default=50)
+
+
+class ExportSerializer(serializers.Serializer):
+    status = serializers.CharField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate_status(self, value):
+        if value not in self.context["statuses"]:
+            raise serializers.ValidationError(
+                f"Choose one of: {', '.join(self.context['statuses'])}."
+            )
+        return value
+
+    def validate(self, data):
+        if data.get("date_from") and data.get("date_to"):
+            if data["date_from"] > data["date_to"]:
+                raise serializers.ValidationError(
+                    "date_from must not be after date_to."
+                )
+        return data
+
+
 class CustomerLoanRequestSettingsSerializer(serializers.ModelSerializer):
     amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=True)
     final_duration_months = serializers.IntegerField(required=True)
@@ -157,8 +255,9 @@ class CustomerLoanRequestSettingsSerializer(serializers.ModelSerializer):
         return value
 
 
-class LoanSerializer(serializers.ModelSerializer):
+class LoanSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     documents = DocumentSerializer(many=True, required=False)
+    expandable_fields = ["documents"]
 
     class Meta:
         model = Loan
@@ -170,10 +269,18 @@ class LoanSerializer(serializers.ModelSerializer):
             "interest_rate",
             "status",
             "documents",
+            "due_date",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = [
+            "id",
+            "customer",
+            "status",
+            "due_date",
             "created_at",
             "updated_at",
         ]
-        read_only_fields = ["id", "customer", "status", "created_at", "updated_at"]
 
     def create(self, validated_data):
         customer = self.context["request"].user
@@ -182,6 +289,44 @@ class LoanSerializer(serializers.ModelSerializer):
         )
 
 
+class DashboardLoanSerializer(serializers.ModelSerializer):
+    total_expected = serializers.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        source="total_expected_payment",
+        read_only=True,
+    )
+    next_payment = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Loan
+        fields = [
+            "id",
+            "amount",
+            "term_months",
+            "interest_rate",
+            "status",
+            "total_expected",
+            "total_paid",
+            "outstanding_balance",
+            "due_date",
+            "next_payment",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+    def get_next_payment(self, loan):
+        installment = loan.next_installment()
+        if installment is None:
+            return None
+        date, amount = installment
+        return {"date": date.isoformat(), "amount": str(amount)}
+
+
+class MaturityWindowSerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=0, max_value=366, default=30)
+
+
 class LoanPaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = LoanPayment
@@ -194,9 +339,7 @@ class LoanPaymentSerializer(serializers.ModelSerializer):
         if loan.status == Loan.STATUS_FULLY_PAID:
             raise serializers.ValidationError("This loan has already been fully paid.")
 
-        remaining_balance = Decimal(loan.total_expected_payment()) - Decimal(
-            loan.total_paid()
-        )
+        remaining_balance = loan.outstanding_balance
 
         if Decimal(attrs["amount_paid"]) > remaining_balance:
             raise serializers.ValidationError(
@@ -218,15 +361,20 @@ class LoanPaymentSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("Fund transfer failed.")
 
             payment = super().create(validated_data)
+            if not loan.record_payment(payment.amount_paid):
+                raise serializers.ValidationError(
+                    f"The amount exceeds the remaining balance of "
+                    f"{loan.outstanding_balance:.2f}."
+                )
             loan.update_status()
 
-            bank_budget = BankBudget.get_instance(for_update=True)
-            bank_budget.add_funds(payment.amount_paid)
-            bank_budget.save()
+            BankBudget.get_instance().add_funds(
+                payment.amount_paid, kind=BudgetEntry.KIND_REPAYMENT, loan=loan
+            )
 
             logger.info(
                 f"User {self.context['request'].user} made a payment of {payment.amount_paid} "
-                f"on loan {loan.id}. Bank total funds updated to {bank_budget.total_funds}."
+                f"on loan {loan.id}."
             )
 
         return payment
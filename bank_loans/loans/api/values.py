@@ -0,0 +1,184 @@
+"""
+Read-only serialization of querysets straight from ``.values()`` rows.
+
+``ValuesSerializer`` compiles a ``ModelSerializer`` class into a list of
+column accessors once, then turns plain row dicts into the same primitives
+the serializer would produce, without instantiating model instances or
+walking the serializer field machinery per row.
+"""
+
+import decimal
+from collections import defaultdict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from rest_framework import serializers
+from rest_framework.fields import ISO_8601
+from rest_framework.settings import api_settings
+
+PARENT_KEY = "values_parent_pk"
+
+
+def decimal_accessor(field):
+    coerce_to_string = getattr(
+        field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+    )
+    if (
+        field.localize
+        or field.normalize_output
+        or not coerce_to_string
+        or field.decimal_places is None
+    ):
+        return field.to_representation
+
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def to_representation(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return "{:f}".format(
+            value.quantize(exponent, rounding=rounding, context=context)
+        )
+
+    return to_representation
+
+
+def datetime_accessor(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    tz = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    if tz is None or output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+
+    def to_representation(value):
+        value = value.astimezone(tz).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return to_representation
+
+
+def file_accessor(field, model_field, request):
+    if not getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL):
+        return None
+
+    storage = model_field.storage
+
+    def to_representation(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return to_representation
+
+
+class ValuesSerializer:
+    """
+    Serialize querysets of ``serializer_class.Meta.model`` from ``.values()``
+    with output identical to ``serializer_class(many=True).data``.
+
+    Only read paths are supported: plain model fields, primary key related
+    fields and nested ``many=True`` model serializers over a reverse foreign
+    key (fetched with one extra query, like ``prefetch_related``).
+    """
+
+    def __init__(self, serializer_class, context=None):
+        self.context = context or {}
+        serializer = serializer_class(context=self.context)
+        self.model = serializer.Meta.model
+        self.fields = []
+        self.nested = {}
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                self.nested[name] = self.compile_nested(field)
+                self.fields.append((name, None, None))
+                continue
+            if "." in field.source or field.source == "*":
+                raise ImproperlyConfigured(
+                    f"{serializer_class.__name__}.{name}: dotted sources are not "
+                    f"supported by ValuesSerializer."
+                )
+            self.fields.append((name, field.source, self.compile(field)))
+
+    @property
+    def columns(self):
+        return [source for _, source, _ in self.fields if source is not None]
+
+    def compile(self, field):
+        """
+        Return a callable turning a non-null column value into its
+        representation, or ``None`` when the value is used as is.
+        """
+        if isinstance(field, serializers.RelatedField):
+            if getattr(field, "pk_field", None) is not None:
+                return field.pk_field.to_representation
+            return None
+        if isinstance(field, serializers.DecimalField):
+            return decimal_accessor(field)
+        if isinstance(field, serializers.DateTimeField):
+            return datetime_accessor(field)
+        if isinstance(field, serializers.FileField):
+            model_field = self.model._meta.get_field(field.source)
+            return file_accessor(field, model_field, self.context.get("request"))
+        if type(field) is serializers.CharField:
+            return str
+        return field.to_representation
+
+    def compile_nested(self, field):
+        relation = self.model._meta.get_field(field.source)
+        child = ValuesSerializer(field.child.__class__, self.context)
+        if not relation.one_to_many or child.nested:
+            raise ImproperlyConfigured(
+                f"{field.field_name}: only a flat serializer over a reverse "
+                f"foreign key can be nested."
+            )
+        return child, relation.field.name
+
+    def values(self, queryset, *extra):
+        """
+        Return ``queryset`` as a values queryset holding the serialized columns
+        (and the ``extra`` ones).
+        """
+        columns = dict.fromkeys([*self.columns, *extra])
+        return queryset.prefetch_related(None).values(*columns)
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        ids = [row["id"] for row in rows]
+        children = {
+            name: child.children_of(ids, parent_field)
+            for name, (child, parent_field) in self.nested.items()
+        }
+        return [self.represent(row, children) for row in rows]
+
+    def represent(self, row, children=None):
+        item = {}
+        for name, source, to_representation in self.fields:
+            if source is None:
+                item[name] = children[name].get(row["id"], [])
+                continue
+            value = row[source]
+            if value is None or to_representation is None:
+                item[name] = value
+            else:
+                item[name] = to_representation(value)
+        return item
+
+    def children_of(self, parent_ids, parent_field):
+        if not parent_ids:
+            return {}
+        children = defaultdict(list)
+        rows = self.model._default_manager.filter(
+            **{f"{parent_field}__in": parent_ids}
+        ).values(*self.columns, **{PARENT_KEY: F(parent_field)})
+        for row in rows:
+            children[row[PARENT_KEY]].append(self.represent(row))
+        return children
@@ -1,29 +1,166 @@
+import hashlib
 import logging
+from datetime import timedelta
 from django.db import transaction
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.parsers import MultiPartParser
+from rest_framework.serializers import ListSerializer
 from rest_framework import generics, filters
 from django_filters.rest_framework import DjangoFilterBackend
 
-from bank_loans.loans.models import BankBudget, Fund, Loan, LoanRequest
+from bank_loans.loans import cache
+from bank_loans.loans.exports import CONTENT_TYPES, EXPORTS
+from bank_loans.loans.imports import PaymentImport, as_text, guess_format, read_rows
+from bank_loans.loans.models import BankBudget, Fund, Loan, LoanRequest, StatusCounter
 from bank_loans.loans.permissions import IsProvider, IsCustomer, IsBankPersonnel
+from bank_loans.users.api.serializers import UserDetailSerializer
 from .serializers import (
+    BatchIdsSerializer,
+    BulkLoanRequestSerializer,
     CustomerLoanRequestSettingsSerializer,
+    DashboardLoanSerializer,
     DocumentSerializer,
+    ExportSerializer,
     FundSerializer,
+    LoanRequestSearchSerializer,
     LoanRequestSerializer,
     LoanRequestSettingsSerializer,
     LoanSerializer,
     LoanPaymentSerializer,
+    MaturityWindowSerializer,
+    PaymentImportSerializer,
 )
+from .values import ValuesSerializer
 
 
 logger = logging.getLogger(__name__)
 
 
+class SparseQuerysetMixin:
+    """
+    Narrow the queryset to the fields the serializer keeps for this request
+    (see ``SparseFieldsMixin``), without the documents prefetch unless the
+    documents are part of the representation.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_serializer().fields
+        if "documents" not in fields:
+            queryset = queryset.prefetch_related(None)
+        columns = [
+            field.source
+            for field in fields.values()
+            if not isinstance(field, ListSerializer)
+        ]
+        return queryset.only(*columns)
+
+
+class ValuesListMixin(SparseQuerysetMixin):
+    """
+    List through ``ValuesSerializer``: rows are read with ``.values()`` and
+    rendered exactly as ``serializer_class`` would render them.
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer = ValuesSerializer(
+            self.get_serializer_class(), self.get_serializer_context()
+        )
+        queryset = self.filter_queryset(self.get_queryset())
+        # The paginator needs the ordering column even when it is not rendered.
+        ordering, _ = self.paginator.get_ordering(request, queryset, self)
+        queryset = serializer.values(queryset, ordering)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.to_representation(page))
+        return Response(serializer.to_representation(queryset))
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``If-None-Match`` with 304 after one query over the resource and
+    its documents, instead of a full render.
+
+    The ETag hashes the ordered ``(pk, updated_at, document count, latest
+    document update)`` of every row it covers. On paginated lists those are
+    the rows of the requested page and the one after it
+    (``KeysetPagination.get_window``), so the query costs about as much as the
+    page itself whatever the size of the list, and a row entering, leaving or
+    moving within the page changes the validator; the list-wide ``count`` is
+    not part of it. Payments are covered through ``Loan.updated_at``, which
+    every payment path bumps. There is no ``Last-Modified``: a timestamp
+    cannot express a row leaving a list or a document being removed. List
+    ETags also roll over daily for the date-windowed views.
+    """
+
+    def get(self, request, *args, **kwargs):
+        rows = self.get_resource_state()
+        if not rows and self.is_detail():
+            return super().get(request, *args, **kwargs)
+
+        etag = self.get_etag(request, rows)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response.headers["ETag"] = etag
+        return response
+
+    def is_detail(self):
+        return (self.lookup_url_kwarg or self.lookup_field) in self.kwargs
+
+    def get_resource_state(self):
+        queryset = self.filter_queryset(self.get_queryset()).annotate(
+            document_count=Count("documents", distinct=True),
+            document_updated=Max("documents__updated_at"),
+        )
+        if self.is_detail():
+            lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+            queryset = queryset.filter(**{self.lookup_field: lookup}).order_by()
+        elif self.paginator is not None:
+            queryset = self.paginator.get_window(queryset, self.request, self)
+        else:
+            queryset = queryset.order_by("pk")
+        return list(
+            queryset.values_list(
+                "pk", "updated_at", "document_count", "document_updated"
+            )
+        )
+
+    def get_etag(self, request, rows):
+        parts = [request.user.pk, request.get_full_path(), rows]
+        if not self.is_detail():
+            parts.append(timezone.localdate())
+        digest = hashlib.sha256(repr(parts).encode()).hexdigest()
+        return quote_etag(digest[:32])
+
+
+class CustomerCacheMixin:
+    """
+    Serve the list from the requesting customer's response cache.
+    """
+
+    cache_name = None
+
+    def list(self, request, *args, **kwargs):
+        key = cache.response_key(
+            self.cache_name, request.user.pk, request.build_absolute_uri()
+        )
+        data = cache.get_response(self.cache_name, key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set_response(key, data)
+        return Response(data)
+
+
 # Funds
 class FundProviderView(generics.ListAPIView):
     queryset = Fund.objects.all()
@@ -44,24 +181,109 @@ class FundProviderCreateView(generics.CreateAPIView):
 
 
 # Personall
-class PersonnelLoanRequestListView(generics.ListAPIView):
+class PersonnelLoanRequestListView(
+    ConditionalGetMixin, ValuesListMixin, generics.ListAPIView
+):
     serializer_class = LoanRequestSerializer
     permission_classes = [IsAuthenticated, IsBankPersonnel]
-    queryset = LoanRequest.objects.all()
+    queryset = LoanRequest.objects.prefetch_related("documents")
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ["status"]
     ordering_fields = ["created_at", "updated_at"]
 
 
-class PersonnelLoanListView(generics.ListAPIView):
+class PersonnelLoanRequestSearchView(generics.ListAPIView):
+    """
+    Requests matching ``?q=`` in their purpose/details or customer, best
+    matches first (see ``LoanRequest.search``).
+    """
+
+    serializer_class = LoanRequestSerializer
+    permission_classes = [IsAuthenticated, IsBankPersonnel]
+    pagination_class = None
+
+    def get_queryset(self):
+        serializer = LoanRequestSearchSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        queryset = LoanRequest.search(serializer.validated_data["q"])
+        return queryset.prefetch_related("documents")[
+            : serializer.validated_data["limit"]
+        ]
+
+
+class PersonnelLoanListView(
+    ConditionalGetMixin, ValuesListMixin, generics.ListAPIView
+):
     serializer_class = LoanSerializer
     permission_classes = [IsAuthenticated, IsBankPersonnel]
-    queryset = Loan.objects.all()
+    queryset = Loan.objects.prefetch_related("documents")
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ["status"]
     ordering_fields = ["created_at", "updated_at"]
 
 
+class PersonnelUpcomingMaturityLoanListView(
+    ConditionalGetMixin, ValuesListMixin, generics.ListAPIView
+):
+    """
+    Open loans falling due within the next ``days`` days, soonest first.
+    """
+
+    serializer_class = LoanSerializer
+    permission_classes = [IsAuthenticated, IsBankPersonnel]
+    ordering = "due_date"
+
+    def get_queryset(self):
+        serializer = MaturityWindowSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        today = timezone.localdate()
+        return Loan.objects.prefetch_related("documents").filter(
+            status__in=Loan.OPEN_STATUSES,
+            due_date__gte=today,
+            due_date__lte=today + timedelta(days=serializer.validated_data["days"]),
+        )
+
+
+class PersonnelPastDueLoanListView(
+    ConditionalGetMixin, ValuesListMixin, generics.ListAPIView
+):
+    """
+    Open loans whose due date has passed, most overdue first.
+    """
+
+    serializer_class = LoanSerializer
+    permission_classes = [IsAuthenticated, IsBankPersonnel]
+    ordering = "due_date"
+
+    def get_queryset(self):
+        return Loan.objects.prefetch_related("documents").filter(
+            status__in=Loan.OPEN_STATUSES,
+            due_date__lt=timezone.localdate(),
+        )
+
+
+class CustomerCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated, IsBankPersonnel]
+
+    def get(self, request):
+        names = [
+            CustomerLoanRequestListView.cache_name,
+            CustomerLoanListView.cache_name,
+        ]
+        return Response(cache.stats(names))
+
+
+class StatusCountsView(APIView):
+    """
+    Loan requests and loans per status, read from ``StatusCounter``.
+    """
+
+    permission_classes = [IsAuthenticated, IsBankPersonnel]
+
+    def get(self, request):
+        return Response(StatusCounter.snapshot())
+
+
 class SetLoanRequestSettingsView(APIView):
     permission_classes = [IsAuthenticated, IsBankPersonnel]
 
@@ -122,6 +344,69 @@ class AcceptLoanRequestView(APIView):
         )
 
 
+class BulkAcceptLoanRequestView(APIView):
+    permission_classes = [IsAuthenticated, IsBankPersonnel]
+
+    def post(self, request):
+        serializer = BulkLoanRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = LoanRequest.approve_many(
+            serializer.validated_data["ids"], request.user
+        )
+
+        return Response(
+            {
+                "approved": sum(
+                    1 for result in results if result["status"] == "approved"
+                ),
+                "results": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class PaymentImportView(APIView):
+    permission_classes = [IsAuthenticated, IsBankPersonnel]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        serializer = PaymentImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        file = serializer.validated_data["file"]
+        file_format = serializer.validated_data.get("format") or guess_format(
+            file.name
+        )
+        report = PaymentImport(
+            batch_size=serializer.validated_data["batch_size"]
+        ).run(read_rows(as_text(file), file_format))
+
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class ExportView(APIView):
+    permission_classes = [IsAuthenticated, IsBankPersonnel]
+
+    def get(self, request, name, file_format):
+        export = EXPORTS.get(name)
+        if export is None or file_format not in CONTENT_TYPES:
+            raise NotFound("Unknown export.")
+
+        serializer = ExportSerializer(
+            data=request.query_params, context={"statuses": export.statuses}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        response = StreamingHttpResponse(
+            export.stream(file_format, **serializer.validated_data),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        filename = f"{name}-{timezone.localdate():%Y%m%d}.{file_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
 class RejectLoanRequestView(APIView):
     permission_classes = [IsAuthenticated, IsBankPersonnel]
 
@@ -151,7 +436,10 @@ class RejectLoanRequestView(APIView):
 
 
 # Customer
-class CustomerLoanRequestListView(generics.ListAPIView):
+class CustomerLoanRequestListView(
+    ConditionalGetMixin, CustomerCacheMixin, ValuesListMixin, generics.ListAPIView
+):
+    cache_name = "customer-loan-requests"
     serializer_class = LoanRequestSerializer
     permission_classes = [IsAuthenticated, IsCustomer]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -159,10 +447,15 @@ class CustomerLoanRequestListView(generics.ListAPIView):
     ordering_fields = ["created_at", "updated_at"]
 
     def get_queryset(self):
-        return LoanRequest.objects.filter(customer=self.request.user)
+        return LoanRequest.objects.filter(customer=self.request.user).prefetch_related(
+            "documents"
+        )
 
 
-class CustomerLoanListView(generics.ListAPIView):
+class CustomerLoanListView(
+    ConditionalGetMixin, CustomerCacheMixin, ValuesListMixin, generics.ListAPIView
+):
+    cache_name = "customer-loans"
     serializer_class = LoanSerializer
     permission_classes = [IsAuthenticated, IsCustomer]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -170,7 +463,46 @@ class CustomerLoanListView(generics.ListAPIView):
     ordering_fields = ["created_at", "updated_at"]
 
     def get_queryset(self):
-        return Loan.objects.filter(customer=self.request.user)
+        return Loan.objects.filter(customer=self.request.user).prefetch_related(
+            "documents"
+        )
+
+
+class CustomerDashboardView(APIView):
+    """
+    Profile, open loan requests, loans with their balances and the customer's
+    counts per status, in a fixed number of queries.
+    """
+
+    permission_classes = [IsAuthenticated, IsCustomer]
+
+    def get(self, request):
+        user = request.user
+        context = {"request": request}
+        loan_requests = (
+            LoanRequest.objects.filter(
+                customer=user, status__in=LoanRequest.OPEN_STATUSES
+            )
+            .defer("search_vector")
+            .prefetch_related("documents")
+            .order_by("-created_at", "-pk")
+        )
+        loans = Loan.objects.filter(customer=user).order_by("-created_at", "-pk")
+        return Response(
+            {
+                "profile": UserDetailSerializer(user).data,
+                "requests": LoanRequestSerializer(
+                    loan_requests, many=True, context=context
+                ).data,
+                "loans": DashboardLoanSerializer(
+                    loans, many=True, context=context
+                ).data,
+                "counts": {
+                    "requests": LoanRequest.count_by_status(customer=user),
+                    "loans": Loan.count_by_status(customer=user),
+                },
+            }
+        )
 
 
 class CustomerLoanRequestCreateView(generics.CreateAPIView):
@@ -257,35 +589,112 @@ class CustomerSetLoanRequestSettingsView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class RequestStatusView(generics.RetrieveAPIView):
+class RequestStatusView(
+    ConditionalGetMixin, SparseQuerysetMixin, generics.RetrieveAPIView
+):
     serializer_class = LoanRequestSerializer
     permission_classes = [IsAuthenticated, IsCustomer]
 
     def get_queryset(self):
-        return LoanRequest.objects.filter(customer=self.request.user)
+        return LoanRequest.objects.filter(customer=self.request.user).prefetch_related(
+            "documents"
+        )
 
 
-class LoanStatusView(generics.RetrieveAPIView):
+class LoanStatusView(
+    ConditionalGetMixin, SparseQuerysetMixin, generics.RetrieveAPIView
+):
     serializer_class = LoanSerializer
     permission_classes = [IsAuthenticated, IsCustomer]
 
     def get_queryset(self):
-        return Loan.objects.filter(customer=self.request.user)
+        return Loan.objects.filter(customer=self.request.user).prefetch_related(
+            "documents"
+        )
+
+
+class BatchRetrieveMixin(SparseQuerysetMixin):
+    """
+    Retrieve the rows listed in ``?ids=1,2,3`` (or a POSTed ``{"ids": [...]}``)
+    with one query plus its prefetches. Personnel see every row and customers
+    their own; the ids left out are reported as ``missing`` or ``forbidden``.
+    """
+
+    permission_classes = [IsAuthenticated, IsCustomer | IsBankPersonnel]
+    filter_backends = []
+
+    def get_queryset(self):
+        queryset = self.model.objects.prefetch_related("documents")
+        if IsBankPersonnel().has_permission(self.request, self):
+            return queryset
+        return queryset.filter(customer=self.request.user)
+
+    def get(self, request):
+        ids = request.query_params.get("ids", "").split(",")
+        return self.retrieve_batch({"ids": [pk for pk in ids if pk.strip()]})
+
+    def post(self, request):
+        return self.retrieve_batch(request.data)
+
+    def retrieve_batch(self, data):
+        serializer = BatchIdsSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+
+        found = self.filter_queryset(self.get_queryset()).in_bulk(ids)
+        absent = [pk for pk in ids if pk not in found]
+        existing = set()
+        if absent:
+            existing = set(
+                self.model.objects.filter(pk__in=absent).values_list("pk", flat=True)
+            )
+
+        results = [found[pk] for pk in ids if pk in found]
+        return Response(
+            {
+                "results": self.get_serializer(results, many=True).data,
+                "missing": [pk for pk in absent if pk not in existing],
+                "forbidden": [pk for pk in absent if pk in existing],
+            }
+        )
+
+
+class LoanRequestBatchView(BatchRetrieveMixin, generics.GenericAPIView):
+    model = LoanRequest
+    serializer_class = LoanRequestSerializer
+
+
+class LoanBatchView(BatchRetrieveMixin, generics.GenericAPIView):
+    model = Loan
+    serializer_class = LoanSerializer
 
 
 class LoanPaymentView(generics.CreateAPIView):
     serializer_class = LoanPaymentSerializer
     permission_classes = [IsAuthenticated, IsCustomer]
 
+    def create(self, request, *args, **kwargs):
+        # The loan stays locked from validation to the status update, so that
+        # a sweep or another payment cannot move its status in between and
+        # make the status counters count the move twice.
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+
+    def get_loan(self):
+        if not hasattr(self, "_loan"):
+            try:
+                self._loan = Loan.objects.select_for_update().get(
+                    pk=self.kwargs.get("pk")
+                )
+            except Loan.DoesNotExist:
+                raise NotFound("The specified loan does not exist.")
+        return self._loan
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        loan_id = self.kwargs.get("pk")
-        try:
-            loan = Loan.objects.get(pk=loan_id)
-        except Loan.DoesNotExist:
-            raise NotFound("The specified loan does not exist.")
+        loan = self.get_loan()
 
-        if loan.customer != self.request.user:
+        if loan.customer_id != self.request.user.pk:
             raise PermissionDenied(
                 "You are not authorized to make payments for this loan."
             )
@@ -294,5 +703,4 @@ class LoanPaymentView(generics.CreateAPIView):
         return context
 
     def perform_create(self, serializer):
-        loan = self.get_serializer_context().get("loan")
-        serializer.save(loan=loan)
+        serializer.save(loan=self.get_loan())
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LoansConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "bank_loans.loans"
+
+    def ready(self):
+        from . import signals  # noqa: F401
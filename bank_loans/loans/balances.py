@@ -0,0 +1,86 @@
+"""
+Maintenance of the denormalized ``Loan.total_paid`` and
+``Loan.outstanding_balance`` columns.
+
+Loans are walked in primary key chunks and their paid totals recomputed from
+``LoanPayment`` with one grouped query per chunk.
+"""
+
+from django.db import transaction
+from django.db.models import Sum
+
+from bank_loans.loans import cache
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanPayment
+
+
+def iter_pk_chunks(chunk_size):
+    last_pk = 0
+    while True:
+        pks = list(
+            Loan.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def stale_loans(loans):
+    """
+    Return the loans whose stored balance disagrees with their payments, with
+    the corrected values set on the instances.
+    """
+    paid = dict(
+        LoanPayment.objects.filter(loan__in=loans)
+        .values("loan_id")
+        .annotate(total=Sum("amount_paid"))
+        .values_list("loan_id", "total")
+    )
+    stale = []
+    for loan in loans:
+        total_paid = paid.get(loan.pk) or 0
+        outstanding_balance = loan.total_expected_payment() - total_paid
+        if (
+            loan.total_paid != total_paid
+            or loan.outstanding_balance != outstanding_balance
+        ):
+            loan.total_paid = total_paid
+            loan.outstanding_balance = outstanding_balance
+            stale.append(loan)
+    return stale
+
+
+def find_mismatches(chunk_size=1000):
+    """
+    Yield ``(loan_id, stored, expected)`` for every loan whose balance columns
+    disagree with its payments.
+    """
+    for pks in iter_pk_chunks(chunk_size):
+        loans = list(Loan.objects.filter(pk__in=pks))
+        stored = {
+            loan.pk: (loan.total_paid, loan.outstanding_balance) for loan in loans
+        }
+        for loan in stale_loans(loans):
+            yield loan.pk, stored[loan.pk], (
+                loan.total_paid,
+                loan.outstanding_balance,
+            )
+
+
+def rebuild(chunk_size=1000):
+    """
+    Recompute the balance columns of every loan, one transaction per chunk.
+    Returns the number of loans that were corrected.
+    """
+    corrected = 0
+    for pks in iter_pk_chunks(chunk_size):
+        with transaction.atomic():
+            loans = list(Loan.objects.select_for_update().filter(pk__in=pks))
+            stale = stale_loans(loans)
+            Loan.objects.bulk_update(stale, ["total_paid", "outstanding_balance"])
+            cache.invalidate(*(loan.customer_id for loan in stale))
+        corrected += len(stale)
+    return corrected
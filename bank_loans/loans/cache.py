@@ -0,0 +1,117 @@
+"""
+Per-customer cache of the customer loan list responses.
+
+Every customer has a version number in the cache that is part of the key of
+each of their cached responses; bumping it (``invalidate``) orphans all of
+them at once, and they expire on their own. A global generation does the same
+for every customer, for set-based updates that touch many customers.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+PREFIX = "loans:customer-cache"
+GLOBAL = "all"
+
+
+def _version_key(owner):
+    return f"{PREFIX}:version:{owner}"
+
+
+def _get_versions(*owners):
+    keys = [_version_key(owner) for owner in owners]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, 1, timeout=None)
+            versions[key] = cache.get(key, 1)
+    return [versions[key] for key in keys]
+
+
+def _bump(owner):
+    key = _version_key(owner)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def invalidate(*customer_ids):
+    """
+    Drop the cached responses of ``customer_ids``.
+
+    The versions are bumped right away and again once the current transaction
+    commits, so a response rendered from not yet committed rows in between is
+    never served.
+    """
+    customer_ids = {pk for pk in customer_ids if pk is not None}
+    if not customer_ids:
+        return
+
+    def bump():
+        for customer_id in customer_ids:
+            _bump(customer_id)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def invalidate_all():
+    _bump(GLOBAL)
+    transaction.on_commit(lambda: _bump(GLOBAL))
+
+
+def response_key(name, user_id, path):
+    """
+    Return the key of a cached response under the current versions.
+
+    Read it once, before rendering, and pass it to both ``get_response`` and
+    ``set_response``: a response rendered while an invalidation lands is then
+    stored under the old versions, where nothing reads it any more.
+    """
+    generation, version = _get_versions(GLOBAL, user_id)
+    digest = hashlib.sha256(path.encode()).hexdigest()[:32]
+    return f"{PREFIX}:{name}:{user_id}:{generation}:{version}:{digest}"
+
+
+def get_response(name, key):
+    data = cache.get(key)
+    record(name, hit=data is not None)
+    return data
+
+
+def set_response(key, data):
+    cache.set(key, data, settings.CUSTOMER_CACHE_TIMEOUT)
+
+
+def _stats_key(name, counter):
+    return f"{PREFIX}:stats:{name}:{counter}"
+
+
+def record(name, hit):
+    key = _stats_key(name, "hits" if hit else "misses")
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def stats(names):
+    """
+    Return the hit/miss counters of the caches called ``names``.
+    """
+    result = {}
+    for name in names:
+        hits = cache.get(_stats_key(name, "hits"), 0)
+        misses = cache.get(_stats_key(name, "misses"), 0)
+        total = hits + misses
+        result[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+    return result
@@ -0,0 +1,63 @@
+"""
+Row counts that stay cheap on large tables.
+
+Above ``APPROXIMATE_COUNT_THRESHOLD`` rows the PostgreSQL planner's estimate
+is returned instead of an exact ``COUNT(*)``: ``pg_class.reltuples`` for a
+whole table, the ``EXPLAIN`` row estimate for a filtered queryset. Below the
+threshold, and on other databases, counts are exact.
+"""
+
+import json
+from functools import cached_property
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset``, or ``None`` when the
+    database cannot provide one.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    queryset = queryset.order_by()
+    if not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed or analyzed.
+        if row and row[0] >= 0:
+            return int(row[0])
+
+    plan = json.loads(queryset.explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def approximate_count(queryset, threshold=None):
+    """
+    Count ``queryset``, using the planner's estimate when it is above
+    ``threshold`` (``APPROXIMATE_COUNT_THRESHOLD`` by default).
+    """
+    if threshold is None:
+        threshold = settings.APPROXIMATE_COUNT_THRESHOLD
+    estimate = estimate_count(queryset)
+    if estimate is not None and estimate >= threshold:
+        return estimate
+    return queryset.count()
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator for the admin changelists, counting with ``approximate_count``.
+    """
+
+    @cached_property
+    def count(self):
+        return approximate_count(self.object_list)
@@ -0,0 +1,150 @@
+"""
+Streaming extracts of the loans tables as CSV or NDJSON.
+
+Rows are read with ``values_list().iterator()`` (a server-side cursor on
+PostgreSQL) and rendered line by line, so memory use does not depend on the
+number of rows exported.
+"""
+
+import csv
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import DateTimeField
+from django.utils import timezone
+
+from bank_loans.loans.imports import FORMAT_CSV
+from bank_loans.loans.imports import FORMAT_NDJSON
+from bank_loans.loans.models import Fund
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanPayment
+from bank_loans.loans.models import LoanRequest
+
+CONTENT_TYPES = {
+    FORMAT_CSV: "text/csv",
+    FORMAT_NDJSON: "application/x-ndjson",
+}
+
+
+class Export:
+    def __init__(self, model, columns, date_field):
+        self.model = model
+        self.columns = columns
+        self.date_field = date_field
+
+    @property
+    def statuses(self):
+        try:
+            field = self.model._meta.get_field("status")
+        except FieldDoesNotExist:
+            return []
+        return [value for value, _ in field.choices]
+
+    def queryset(self, status=None, date_from=None, date_to=None):
+        """
+        Return the rows to export, oldest first. ``date_from`` and ``date_to``
+        are inclusive local dates.
+        """
+        if isinstance(self.model._meta.get_field(self.date_field), DateTimeField):
+            # Compare with the local day boundaries rather than casting the
+            # column to a date, so that its index can be used.
+            date_from = date_from and start_of_day(date_from)
+            date_to = date_to and start_of_day(date_to)
+        queryset = self.model.objects.all()
+        if status:
+            queryset = queryset.filter(status=status)
+
+        if date_from:
+            queryset = queryset.filter(**{f"{self.date_field}__gte": date_from})
+        if date_to:
+            date_to += datetime.timedelta(days=1)
+            queryset = queryset.filter(**{f"{self.date_field}__lt": date_to})
+        return queryset.order_by("pk").values_list(*self.columns)
+
+    def stream(self, file_format, chunk_size=2000, **filters):
+        rows = self.queryset(**filters).iterator(chunk_size=chunk_size)
+        if file_format == FORMAT_NDJSON:
+            return render_ndjson(self.columns, rows)
+        return render_csv(self.columns, rows)
+
+
+EXPORTS = {
+    "loans": Export(
+        Loan,
+        [
+            "id",
+            "customer",
+            "amount",
+            "term_months",
+            "interest_rate",
+            "status",
+            "total_paid",
+            "outstanding_balance",
+            "due_date",
+            "created_at",
+            "updated_at",
+        ],
+        date_field="created_at",
+    ),
+    "requests": Export(
+        LoanRequest,
+        [
+            "id",
+            "customer",
+            "status",
+            "amount",
+            "min_amount",
+            "max_amount",
+            "interest_rate",
+            "max_duration_months",
+            "final_duration_months",
+            "purpose",
+            "secured",
+            "created_at",
+            "updated_at",
+        ],
+        date_field="created_at",
+    ),
+    "payments": Export(
+        LoanPayment,
+        ["id", "loan", "amount_paid", "payment_date"],
+        date_field="payment_date",
+    ),
+    "funds": Export(Fund, ["id", "user", "amount", "created_at"], "created_at"),
+}
+
+
+def start_of_day(date):
+    return timezone.make_aware(datetime.datetime.combine(date, datetime.time.min))
+
+
+def format_value(value):
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).isoformat()
+    if isinstance(value, (datetime.date, Decimal)):
+        return str(value)
+    return value
+
+
+class Echo:
+    """
+    File-like object handing back what ``csv.writer`` writes to it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def render_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+def render_ndjson(columns, rows):
+    for row in rows:
+        values = [format_value(value) for value in row]
+        yield json.dumps(dict(zip(columns, values))) + "\n"
@@ -0,0 +1,252 @@
+"""
+Bulk import of loan repayments from payment processor files.
+
+Files are CSV (with a ``loan,amount_paid`` header) or NDJSON (one
+``{"loan": ..., "amount_paid": ...}`` object per line). Rows are streamed
+and processed in batches, so memory use is bounded by the batch size. Every
+batch is committed on its own, releasing the loans it locked.
+"""
+
+import csv
+import io
+import itertools
+import json
+import logging
+import re
+from collections import Counter
+from decimal import Decimal
+from decimal import InvalidOperation
+
+from django.db import DatabaseError
+from django.db import transaction
+from django.db.models import Case
+from django.db.models import Value
+from django.db.models import When
+from django.utils import timezone
+
+from bank_loans.loans import cache
+from bank_loans.loans.models import BankBudget
+from bank_loans.loans.models import BudgetEntry
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanPayment
+from bank_loans.loans.models import StatusCounter
+
+logger = logging.getLogger(__name__)
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+FORMATS = [FORMAT_CSV, FORMAT_NDJSON]
+
+MAX_ID = 2**63 - 1
+CENT = Decimal("0.01")
+INTEGER = re.compile(r"[+-]?[0-9]+")
+
+
+def guess_format(filename):
+    if filename.lower().endswith((".ndjson", ".jsonl")):
+        return FORMAT_NDJSON
+    return FORMAT_CSV
+
+
+def read_rows(stream, file_format):
+    """
+    Yield ``(line, row)`` pairs from a text stream, where ``row`` is a dict,
+    or ``None`` when the line could not be parsed.
+    """
+    if file_format == FORMAT_NDJSON:
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError:
+                row = None
+            yield line, row if isinstance(row, dict) else None
+    else:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def parse_id(value):
+    """
+    Return ``value`` as an integer id, accepting only integers and strings of
+    digits; ``int`` alone would also take ``1.9`` or ``true`` from NDJSON.
+    """
+    if isinstance(value, str) and INTEGER.fullmatch(value.strip()):
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError(f"{value!r} is not an integer.")
+
+
+def as_text(file):
+    """
+    Wrap a binary file (e.g. an upload) so that it can be read line by line.
+    """
+    if isinstance(file, io.TextIOBase):
+        return file
+    return io.TextIOWrapper(file, encoding="utf-8", newline="")
+
+
+class PaymentImport:
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.imported = 0
+        self.total_amount = Decimal("0")
+        self.errors = []
+
+    def run(self, rows):
+        """
+        Import the ``(line, row)`` pairs and return the report.
+
+        Each batch runs in its own transaction, together with the credit of
+        its total to the bank budget. A batch failing on the database is
+        rolled back and its rows are reported; the other batches are kept.
+        """
+        rows = self.read(rows)
+        while batch := list(itertools.islice(rows, self.batch_size)):
+            rejected = len(self.errors)
+            try:
+                with transaction.atomic():
+                    imported, amount = self.import_batch(batch)
+            except DatabaseError:
+                logger.exception(f"Payment import batch at line {batch[0][0]} failed.")
+                lines = {error["line"] for error in self.errors[rejected:]}
+                for line, _ in batch:
+                    if line not in lines:
+                        self.reject(line, "The batch of this row failed to import.")
+                continue
+            self.imported += imported
+            self.total_amount += amount
+
+        logger.info(
+            f"Imported {self.imported} loan payments totalling {self.total_amount}, "
+            f"{len(self.errors)} rows rejected."
+        )
+        return self.report()
+
+    def read(self, rows):
+        """
+        Yield the ``(line, row)`` pairs until the file turns out to be
+        unreadable, rejecting the line after the last one read in that case.
+        """
+        line = 0
+        try:
+            for line, row in rows:
+                yield line, row
+        except UnicodeDecodeError:
+            self.reject(line + 1, "The file is not valid UTF-8 from this line on.")
+        except csv.Error as e:
+            self.reject(line + 1, f"The file is not valid CSV from this line on: {e}")
+
+    def report(self):
+        return {
+            "imported": self.imported,
+            "total_amount": f"{self.total_amount:.2f}",
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+        }
+
+    def reject(self, line, error):
+        self.errors.append({"line": line, "error": error})
+
+    def parse(self, batch):
+        parsed = []
+        for line, row in batch:
+            if row is None:
+                self.reject(line, "Malformed row.")
+                continue
+            try:
+                loan_id = parse_id(row.get("loan"))
+                amount = Decimal(str(row.get("amount_paid")))
+            except (TypeError, ValueError, InvalidOperation):
+                self.reject(line, "Row must contain a loan id and an amount_paid.")
+                continue
+            if not 0 < loan_id <= MAX_ID:
+                self.reject(line, f"Loan {loan_id} does not exist.")
+                continue
+            try:
+                amount = amount.quantize(CENT)
+            except InvalidOperation:
+                amount = None
+            if amount is None or amount.is_nan():
+                self.reject(line, "The payment amount is not a valid amount.")
+                continue
+            if amount <= 0:
+                self.reject(line, "The payment amount must be greater than zero.")
+                continue
+            parsed.append((line, loan_id, amount))
+        return parsed
+
+    def import_batch(self, batch):
+        """
+        Record the payments of ``batch`` and credit the bank budget, and
+        return the number of payments and their total.
+        """
+        parsed = self.parse(batch)
+        loan_ids = {loan_id for _, loan_id, _ in parsed}
+        loans = Loan.objects.select_for_update().in_bulk(loan_ids)
+        remaining = {loan.pk: loan.outstanding_balance for loan in loans.values()}
+
+        payments = []
+        for line, loan_id, amount in parsed:
+            loan = loans.get(loan_id)
+            if loan is None:
+                self.reject(line, f"Loan {loan_id} does not exist.")
+                continue
+            if loan.status == Loan.STATUS_FULLY_PAID or remaining[loan_id] <= 0:
+                self.reject(line, f"Loan {loan_id} has already been fully paid.")
+                continue
+            if amount > remaining[loan_id]:
+                self.reject(
+                    line,
+                    f"The amount exceeds the remaining balance of "
+                    f"{remaining[loan_id]:.2f}.",
+                )
+                continue
+            remaining[loan_id] -= amount
+            payments.append(LoanPayment(loan=loan, amount_paid=amount))
+
+        LoanPayment.objects.bulk_create(payments)
+        self.update_loans(
+            [loans[pk] for pk in {p.loan_id for p in payments}], remaining
+        )
+        amount = sum(payment.amount_paid for payment in payments)
+        if amount:
+            BankBudget.get_instance().add_funds(amount, kind=BudgetEntry.KIND_REPAYMENT)
+        return len(payments), amount
+
+    def update_loans(self, loans, remaining):
+        """
+        Apply the new balances and the resulting statuses to the (locked)
+        ``loans`` in a single UPDATE.
+        """
+        if not loans:
+            return
+
+        paid, balances, statuses = [], [], []
+        changes = Counter()
+        for loan in loans:
+            changes[(Loan.status_counter_kind, loan.status)] -= 1
+            loan.total_paid += loan.outstanding_balance - remaining[loan.pk]
+            loan.outstanding_balance = remaining[loan.pk]
+            if loan.is_fully_paid():
+                loan.status = Loan.STATUS_FULLY_PAID
+            elif loan.has_deadline_passed():
+                loan.status = Loan.STATUS_OVERDUE
+            else:
+                loan.status = Loan.STATUS_IN_PROGRESS
+            paid.append(When(pk=loan.pk, then=Value(loan.total_paid)))
+            balances.append(When(pk=loan.pk, then=Value(loan.outstanding_balance)))
+            statuses.append(When(pk=loan.pk, then=Value(loan.status)))
+            changes[(Loan.status_counter_kind, loan.status)] += 1
+
+        amount_field = Loan._meta.get_field("total_paid")
+        Loan.objects.filter(pk__in=[loan.pk for loan in loans]).update(
+            total_paid=Case(*paid, output_field=amount_field),
+            outstanding_balance=Case(*balances, output_field=amount_field),
+            status=Case(*statuses, output_field=Loan._meta.get_field("status")),
+            updated_at=timezone.now(),
+        )
+        StatusCounter.apply(changes)
+        cache.invalidate(*(loan.customer_id for loan in loans))
@@ -0,0 +1,81 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from bank_loans.loans.models import BankBudget
+from bank_loans.loans.models import BudgetEntry
+
+PAYMENT_AMOUNT = Decimal("0.01")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure repayment (or, with --debits, disbursement) throughput against "
+        "the bank budget for an increasing number of concurrent workers. Run it "
+        "against a staging database: the budget is left at its initial balance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            default="1,2,4,8,16",
+            help="Comma separated worker counts to measure.",
+        )
+        parser.add_argument(
+            "--payments",
+            type=int,
+            default=200,
+            help="Payments issued by each worker.",
+        )
+        parser.add_argument(
+            "--debits",
+            action="store_true",
+            help="Measure disbursements, which serialize on the budget row lock.",
+        )
+
+    def handle(self, *args, **options):
+        worker_counts = [int(value) for value in options["workers"].split(",")]
+        payments = options["payments"]
+        debits = options["debits"]
+        budget = BankBudget.get_instance()
+        total = PAYMENT_AMOUNT * payments * sum(worker_counts)
+        if debits:
+            budget.add_funds(total)
+
+        self.stdout.write("workers  payments/sec")
+        for workers in worker_counts:
+            rate = self.measure(workers, payments, debits)
+            self.stdout.write(f"{workers:>7}  {rate:>12.1f}")
+
+        if not debits:
+            budget.withdraw(total)
+
+    def measure(self, workers, payments, debits):
+        barrier = threading.Barrier(workers + 1)
+
+        def pay():
+            barrier.wait()
+            try:
+                budget = BankBudget.get_instance()
+                for _ in range(payments):
+                    if debits:
+                        budget.withdraw(PAYMENT_AMOUNT)
+                    else:
+                        budget.add_funds(
+                            PAYMENT_AMOUNT, kind=BudgetEntry.KIND_REPAYMENT
+                        )
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=pay) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return workers * payments / elapsed
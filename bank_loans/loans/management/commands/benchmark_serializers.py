@@ -0,0 +1,104 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from bank_loans.loans.api.serializers import LoanRequestSerializer
+from bank_loans.loans.api.serializers import LoanSerializer
+from bank_loans.loans.api.values import ValuesSerializer
+from bank_loans.loans.models import Document
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanRequest
+from bank_loans.users.models import User
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows/sec of the ModelSerializer and ValuesSerializer paths used "
+        "by the loans list views. The sample rows are created in a transaction "
+        "that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options["rows"])
+                self.report(options["rows"], options["repeat"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, rows):
+        customer = User.objects.create(
+            username="benchmark-serializers", role=User.ROLE_CUSTOMER
+        )
+        requests = LoanRequest.objects.bulk_create(
+            LoanRequest(
+                customer=customer,
+                max_duration_months=12,
+                purpose="Benchmark",
+                details="Benchmark",
+                amount=Decimal("1000.00"),
+                interest_rate=10.0,
+            )
+            for _ in range(rows)
+        )
+        loans = Loan.objects.bulk_create(
+            Loan(customer=customer, amount=Decimal("1000.00"), term_months=12)
+            for _ in range(rows)
+        )
+        Document.objects.bulk_create(
+            [
+                Document(file="documents/id.pdf", title="id", loan_request=request)
+                for request in requests
+            ]
+            + [
+                Document(file="documents/id.pdf", title="id", loan=loan)
+                for loan in loans
+            ]
+        )
+        self.customer = customer
+
+    def report(self, rows, repeat):
+        context = {"request": Request(APIRequestFactory().get("/"))}
+        cases = [
+            (LoanRequestSerializer, LoanRequest.objects.filter(customer=self.customer)),
+            (LoanSerializer, Loan.objects.filter(customer=self.customer)),
+        ]
+
+        self.stdout.write("serializer              model rows/sec  values rows/sec")
+        for serializer_class, queryset in cases:
+            queryset = queryset.prefetch_related("documents")
+
+            def model_path():
+                return serializer_class(queryset, many=True, context=context).data
+
+            def values_path():
+                serializer = ValuesSerializer(serializer_class, context)
+                return serializer.to_representation(serializer.values(queryset))
+
+            model_rate = rows / self.best_of(model_path, repeat)
+            values_rate = rows / self.best_of(values_path, repeat)
+            self.stdout.write(
+                f"{serializer_class.__name__:<22}  {model_rate:>14.0f}  "
+                f"{values_rate:>15.0f}"
+            )
+
+    def best_of(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from bank_loans.loans import balances
+
+
+class Command(BaseCommand):
+    help = (
+        "Report loans whose total_paid/outstanding_balance columns disagree "
+        "with their payments. Exits with an error if any are found."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        mismatches = 0
+        for loan_id, stored, expected in balances.find_mismatches(
+            chunk_size=options["chunk_size"]
+        ):
+            mismatches += 1
+            self.stdout.write(
+                f"Loan {loan_id}: stored paid/outstanding {stored[0]}/{stored[1]}, "
+                f"expected {expected[0]}/{expected[1]}."
+            )
+        if mismatches:
+            raise CommandError(
+                f"{mismatches} loans are inconsistent, run rebuild_loan_balances."
+            )
+        self.stdout.write("All loan balances are consistent.")
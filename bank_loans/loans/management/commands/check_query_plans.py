@@ -0,0 +1,128 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import transaction
+from rest_framework.test import APIRequestFactory
+from rest_framework.test import force_authenticate
+
+from bank_loans.loans.api.views import CustomerLoanListView
+from bank_loans.loans.api.views import CustomerLoanRequestListView
+from bank_loans.loans.api.views import FundProviderView
+from bank_loans.loans.api.views import PersonnelLoanListView
+from bank_loans.loans.api.views import PersonnelLoanRequestListView
+from bank_loans.loans.api.views import PersonnelPastDueLoanListView
+from bank_loans.loans.api.views import PersonnelUpcomingMaturityLoanListView
+from bank_loans.loans.models import LoanPayment
+from bank_loans.users.models import User
+
+# (view, query string, role of the requesting user, expected index)
+VIEW_CHECKS = [
+    (
+        PersonnelLoanRequestListView,
+        "status=pending_approval",
+        User.ROLE_BANK_PERSONNEL,
+        "loanreq_status_created_idx",
+    ),
+    (
+        PersonnelLoanListView,
+        "status=overdue",
+        User.ROLE_BANK_PERSONNEL,
+        "loan_status_created_idx",
+    ),
+    (
+        PersonnelLoanListView,
+        "status=overdue&ordering=-updated_at",
+        User.ROLE_BANK_PERSONNEL,
+        "loan_status_updated_idx",
+    ),
+    (
+        PersonnelUpcomingMaturityLoanListView,
+        "",
+        User.ROLE_BANK_PERSONNEL,
+        "loan_open_due_date_idx",
+    ),
+    (
+        PersonnelPastDueLoanListView,
+        "",
+        User.ROLE_BANK_PERSONNEL,
+        "loan_open_due_date_idx",
+    ),
+    (
+        CustomerLoanRequestListView,
+        "status=pending_customer",
+        User.ROLE_CUSTOMER,
+        "loanreq_customer_status_idx",
+    ),
+    (
+        CustomerLoanListView,
+        "status=in_progress",
+        User.ROLE_CUSTOMER,
+        "loan_customer_status_idx",
+    ),
+    (FundProviderView, "", User.ROLE_PROVIDER, "fund_user_created_idx"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the querysets of the loans list views (filtered and ordered the "
+        "way the API pages them) and fail if they do not use the indexes meant "
+        "for them. On PostgreSQL sequential scans are disabled for the check, so "
+        "it is meaningful on an empty database too."
+    )
+
+    def handle(self, *args, **options):
+        failures = 0
+        for label, queryset, index in self.get_checks():
+            if connection.vendor == "sqlite" and self.is_partial(queryset, index):
+                # SQLite never matches a partial index against bound parameters.
+                self.stdout.write(f"SKIP  {label}: {index} is a partial index")
+                continue
+            plan = self.explain(queryset)
+            if index in plan:
+                self.stdout.write(f"OK    {label}: {index}")
+            else:
+                failures += 1
+                self.stdout.write(f"FAIL  {label}: {index} not used\n{plan}")
+        if failures:
+            raise CommandError(f"{failures} querysets do not use their index.")
+
+    def get_checks(self):
+        for view_class, query_string, role, index in VIEW_CHECKS:
+            label = f"{view_class.__name__}?{query_string}".rstrip("?")
+            yield label, self.view_queryset(view_class, query_string, role), index
+        yield (
+            "LoanPayment history",
+            LoanPayment.objects.filter(loan_id=1).order_by("-payment_date"),
+            "loanpayment_loan_date_idx",
+        )
+
+    def view_queryset(self, view_class, query_string, role):
+        """
+        Build the queryset ``view_class`` would page for a GET with
+        ``query_string``, ordered the way ``KeysetPagination`` orders it.
+        """
+        request = APIRequestFactory().get(f"/?{query_string}")
+        force_authenticate(request, User(pk=1, role=role))
+        view = view_class()
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        view.format_kwarg = None
+
+        queryset = view.filter_queryset(view.get_queryset())
+        field, descending = view.paginator.get_ordering(view.request, queryset, view)
+        prefix = "-" if descending else ""
+        return queryset.order_by(f"{prefix}{field}", f"{prefix}pk")
+
+    def is_partial(self, queryset, index):
+        return any(
+            model_index.name == index and model_index.condition is not None
+            for model_index in queryset.model._meta.indexes
+        )
+
+    def explain(self, queryset):
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
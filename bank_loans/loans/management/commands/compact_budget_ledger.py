@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bank_loans.loans.models import BudgetSnapshot
+
+
+class Command(BaseCommand):
+    help = "Roll bank budget ledger entries into a new balance snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep compacting every --interval seconds.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=settings.BUDGET_LEDGER_COMPACTION_INTERVAL,
+        )
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=settings.BUDGET_LEDGER_COMPACTION_TIMEOUT,
+            help="Seconds to wait for the transactions in flight.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            snapshot = BudgetSnapshot.compact(timeout=options["timeout"])
+            if snapshot:
+                self.stdout.write(
+                    f"Snapshot up to entry {snapshot.last_entry_id}: "
+                    f"balance {snapshot.balance}."
+                )
+            else:
+                self.stdout.write("Nothing to compact.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
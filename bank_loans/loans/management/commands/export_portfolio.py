@@ -0,0 +1,56 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from bank_loans.loans.exports import EXPORTS
+from bank_loans.loans.imports import FORMAT_CSV
+from bank_loans.loans.imports import FORMATS
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError as e:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD.") from e
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream loans, loan requests, payments or funds to a CSV or NDJSON "
+        "file (or stdout) in constant memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", choices=sorted(EXPORTS))
+        parser.add_argument("--format", choices=FORMATS, default=FORMAT_CSV)
+        parser.add_argument("--status")
+        parser.add_argument("--from", dest="date_from", type=parse_date)
+        parser.add_argument("--to", dest="date_to", type=parse_date)
+        parser.add_argument("--output", help="Output file, stdout by default.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        export = EXPORTS[options["name"]]
+        if options["status"] and options["status"] not in export.statuses:
+            raise CommandError(
+                f"Invalid status, choose one of: {', '.join(export.statuses)}."
+            )
+
+        lines = export.stream(
+            options["format"],
+            chunk_size=options["chunk_size"],
+            status=options["status"],
+            date_from=options["date_from"],
+            date_to=options["date_to"],
+        )
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        try:
+            with open(options["output"], "w", encoding="utf-8", newline="") as out:
+                out.writelines(lines)
+        except OSError as e:
+            raise CommandError(str(e)) from e
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from bank_loans.loans.imports import FORMATS
+from bank_loans.loans.imports import PaymentImport
+from bank_loans.loans.imports import guess_format
+from bank_loans.loans.imports import read_rows
+
+
+class Command(BaseCommand):
+    help = "Import loan repayments from a CSV or NDJSON payments file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="File format, guessed from the extension by default.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or guess_format(path)
+        try:
+            with open(path, encoding="utf-8", newline="") as stream:
+                report = PaymentImport(batch_size=options["batch_size"]).run(
+                    read_rows(stream, file_format)
+                )
+        except OSError as e:
+            raise CommandError(str(e)) from e
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(
+            f"Imported {report['imported']} payments totalling "
+            f"{report['total_amount']}, {len(report['errors'])} rows rejected."
+        )
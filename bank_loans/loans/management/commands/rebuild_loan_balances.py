@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from bank_loans.loans import balances
+
+
+class Command(BaseCommand):
+    help = "Recompute Loan.total_paid and Loan.outstanding_balance from payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        corrected = balances.rebuild(chunk_size=options["chunk_size"])
+        self.stdout.write(f"Corrected {corrected} loans.")
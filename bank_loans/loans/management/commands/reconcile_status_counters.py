@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from bank_loans.loans.models import StatusCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount loan requests and loans per status and correct the status "
+        "counters. With --check, only report the differences and exit with an "
+        "error if any are found."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--check", action="store_true")
+
+    def handle(self, *args, **options):
+        differences = StatusCounter.reconcile(fix=not options["check"])
+        for kind, status, stored, actual in differences:
+            self.stdout.write(f"{kind} {status}: counted {stored}, actual {actual}.")
+        if differences and options["check"]:
+            raise CommandError(
+                f"{len(differences)} status counters are off, "
+                "run reconcile_status_counters."
+            )
+        if differences:
+            self.stdout.write(f"Corrected {len(differences)} status counters.")
+        else:
+            self.stdout.write("All status counters are consistent.")
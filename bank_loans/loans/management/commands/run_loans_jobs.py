@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from bank_loans.loans import scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the loans background jobs (ledger compaction, loan status sweep) "
+        "until interrupted. Run it in one dedicated process."
+    )
+
+    def handle(self, *args, **options):
+        jobs = scheduler.start()
+        self.stdout.write(f"Running {', '.join(job.name for job in jobs)}.")
+        try:
+            for job in jobs:
+                job.join()
+        except KeyboardInterrupt:
+            for job in jobs:
+                job.stop()
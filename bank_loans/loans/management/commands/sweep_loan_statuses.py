@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from bank_loans.loans.models import Loan
+
+
+class Command(BaseCommand):
+    help = "Mark loans overdue, in progress or fully paid from their balance and term."
+
+    def handle(self, *args, **options):
+        moved = Loan.sweep_statuses()
+        for new_status, count in moved.items():
+            self.stdout.write(f"{new_status}: {count}")
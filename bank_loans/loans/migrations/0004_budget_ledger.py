@@ -0,0 +1,108 @@
+# Generated by Django 5.0.9 on 2026-10-17 01:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def open_ledger(apps, schema_editor):
+    BankBudget = apps.get_model("loans", "BankBudget")
+    BudgetEntry = apps.get_model("loans", "BudgetEntry")
+    balance = BankBudget.objects.aggregate(total=Sum("total_funds"))["total"]
+    if balance:
+        BudgetEntry.objects.create(kind="opening", amount=balance)
+
+
+def close_ledger(apps, schema_editor):
+    BankBudget = apps.get_model("loans", "BankBudget")
+    BudgetEntry = apps.get_model("loans", "BudgetEntry")
+    balance = BudgetEntry.objects.aggregate(total=Sum("amount"))["total"]
+    BankBudget.objects.filter(
+        pk=BankBudget.objects.order_by("pk").values("pk")[:1]
+    ).update(total_funds=balance or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loans", "0003_remove_bankbudget_budget"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BudgetSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("balance", models.DecimalField(decimal_places=2, max_digits=15)),
+                ("last_entry_id", models.BigIntegerField(unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Budget Snapshot",
+                "verbose_name_plural": "Budget Snapshots",
+            },
+        ),
+        migrations.CreateModel(
+            name="BudgetEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("opening", "Opening Balance"),
+                            ("fund", "Fund"),
+                            ("disbursement", "Disbursement"),
+                            ("repayment", "Repayment"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=15)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "fund",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="loans.fund",
+                    ),
+                ),
+                (
+                    "loan",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="loans.loan",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Budget Entry",
+                "verbose_name_plural": "Budget Entries",
+            },
+        ),
+        migrations.RunPython(open_ledger, close_ledger),
+        migrations.RemoveField(
+            model_name="bankbudget",
+            name="total_funds",
+        ),
+    ]
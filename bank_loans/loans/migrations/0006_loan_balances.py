@@ -0,0 +1,55 @@
+# Generated by Django 5.0.9 on 2026-10-17 01:45
+
+from decimal import ROUND_HALF_UP
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_balances(apps, schema_editor):
+    Loan = apps.get_model("loans", "Loan")
+    LoanPayment = apps.get_model("loans", "LoanPayment")
+    last_pk = 0
+    while True:
+        loans = list(Loan.objects.filter(pk__gt=last_pk).order_by("pk")[:1000])
+        if not loans:
+            return
+        paid = dict(
+            LoanPayment.objects.filter(loan__in=loans)
+            .values("loan_id")
+            .annotate(total=Sum("amount_paid"))
+            .values_list("loan_id", "total")
+        )
+        for loan in loans:
+            expected = loan.amount
+            if loan.interest_rate:
+                multiplier = Decimal(str(1 + Decimal(loan.interest_rate) / 100))
+                expected = (loan.amount * multiplier).quantize(
+                    Decimal("0.01"), rounding=ROUND_HALF_UP
+                )
+            loan.total_paid = paid.get(loan.pk) or 0
+            loan.outstanding_balance = expected - loan.total_paid
+        Loan.objects.bulk_update(loans, ["total_paid", "outstanding_balance"])
+        last_pk = loans[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loans", "0004_budget_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="loan",
+            name="outstanding_balance",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name="loan",
+            name="total_paid",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.0.9 on 2026-10-17 01:46
+
+from dateutil.relativedelta import relativedelta
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_due_dates(apps, schema_editor):
+    Loan = apps.get_model("loans", "Loan")
+    last_pk = 0
+    while True:
+        loans = list(
+            Loan.objects.filter(pk__gt=last_pk, term_months__gt=0)
+            .order_by("pk")
+            .only("pk", "created_at", "term_months")[:1000]
+        )
+        if not loans:
+            return
+        for loan in loans:
+            loan.due_date = timezone.localdate(loan.created_at) + relativedelta(
+                months=loan.term_months
+            )
+        Loan.objects.bulk_update(loans, ["due_date"])
+        last_pk = loans[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loans", "0006_loan_balances"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="loan",
+            name="due_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_due_dates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                condition=models.Q(("status__in", ["in_progress", "overdue"])),
+                fields=["due_date", "id"],
+                name="loan_open_due_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.9 on 2026-10-17 01:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loans", "0007_loan_due_date"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="fund",
+            index=models.Index(
+                fields=["user", "created_at"], name="fund_user_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["status", "updated_at", "id"], name="loan_status_updated_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["customer", "status", "created_at", "id"],
+                name="loan_customer_status_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loanpayment",
+            index=models.Index(
+                fields=["loan", "payment_date"], name="loanpayment_loan_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loanrequest",
+            index=models.Index(
+                fields=["status", "created_at", "id"], name="loanreq_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loanrequest",
+            index=models.Index(
+                fields=["customer", "status", "created_at", "id"],
+                name="loanreq_customer_status_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.0.9 on 2026-10-17 02:02
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('pg_catalog.english', coalesce({table}purpose, '')), 'A')"
+    " || setweight(to_tsvector('pg_catalog.english', coalesce({table}details, '')),"
+    " 'B')"
+)
+
+
+def create_search_support(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"""
+        CREATE FUNCTION loans_loanrequest_search_vector() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {SEARCH_VECTOR.format(table="NEW.")};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """)
+    schema_editor.execute(
+        "CREATE TRIGGER loans_loanrequest_search_vector_trigger "
+        "BEFORE INSERT OR UPDATE OF purpose, details ON loans_loanrequest "
+        "FOR EACH ROW EXECUTE FUNCTION loans_loanrequest_search_vector()"
+    )
+    schema_editor.execute(
+        f"UPDATE loans_loanrequest SET search_vector = {SEARCH_VECTOR.format(table='')}"
+    )
+    schema_editor.execute(
+        "CREATE INDEX loanreq_search_vector_idx "
+        "ON loans_loanrequest USING gin (search_vector)"
+    )
+
+
+def drop_search_support(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS loanreq_search_vector_idx")
+    schema_editor.execute(
+        "DROP TRIGGER IF EXISTS loans_loanrequest_search_vector_trigger "
+        "ON loans_loanrequest"
+    )
+    schema_editor.execute("DROP FUNCTION IF EXISTS loans_loanrequest_search_vector()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loans", "0008_api_filter_indexes"),
+        ("users", "0004_user_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="loanrequest",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_support, drop_search_support),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.9 on 2026-10-17 02:07
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    StatusCounter = apps.get_model("loans", "StatusCounter")
+    counters = []
+    for kind, model_name in [("loan_request", "LoanRequest"), ("loan", "Loan")]:
+        model = apps.get_model("loans", model_name)
+        counts = dict(
+            model.objects.order_by().values_list("status").annotate(Count("pk"))
+        )
+        for status, _ in model._meta.get_field("status").choices:
+            counters.append(
+                StatusCounter(kind=kind, status=status, count=counts.get(status, 0))
+            )
+    StatusCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loans", "0009_loanrequest_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatusCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=20)),
+                ("status", models.CharField(max_length=50)),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="statuscounter",
+            constraint=models.UniqueConstraint(
+                fields=("kind", "status"), name="statuscounter_kind_status_unique"
+            ),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.9 on 2026-10-17 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("loans", "0010_status_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="loan",
+            index=models.Index(
+                fields=["status", "created_at", "id"], name="loan_status_created_idx"
+            ),
+        ),
+    ]
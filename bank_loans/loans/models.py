@@ -1,32 +1,224 @@
-from datetime import datetime
+from collections import Counter
+from decimal import ROUND_HALF_UP
 from decimal import Decimal
 import logging
+import time
 
 from dateutil.relativedelta import relativedelta
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.postgres.search import SearchRank
+from django.contrib.postgres.search import SearchVectorField
+from django.contrib.postgres.search import TrigramSimilarity
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.db import models
 from django.db import transaction
+from django.db.models import Case
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import FloatField
+from django.db.models import Max
+from django.db.models import Q
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from bank_loans.loans import cache
 
 logger = logging.getLogger(__name__)
 
+CENT = Decimal("0.01")
+
 User = get_user_model()
 
 
+class BudgetEntry(models.Model):
+    """
+    Immutable record of money moving in or out of the bank budget.
+
+    Credits are positive and debits negative, so the balance is the sum of
+    ``amount`` on top of the latest ``BudgetSnapshot``. Entries are written
+    after ``begin_write`` in the same transaction.
+    """
+
+    KIND_OPENING = "opening"
+    KIND_FUND = "fund"
+    KIND_DISBURSEMENT = "disbursement"
+    KIND_REPAYMENT = "repayment"
+
+    KIND_CHOICES = [
+        (KIND_OPENING, "Opening Balance"),
+        (KIND_FUND, "Fund"),
+        (KIND_DISBURSEMENT, "Disbursement"),
+        (KIND_REPAYMENT, "Repayment"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    fund = models.ForeignKey("Fund", on_delete=models.SET_NULL, null=True, blank=True)
+    loan = models.ForeignKey("Loan", on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Budget Entry"
+        verbose_name_plural = "Budget Entries"
+
+    @staticmethod
+    def begin_write():
+        """
+        Give the current transaction its id before it allocates entry ids.
+
+        PostgreSQL only assigns it on the first row written, just after the
+        id sequence was read, which would let ``BudgetSnapshot.compact``
+        miss the transaction while it waits for the writers in flight.
+        """
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT txid_current()")
+
+
+class BudgetSnapshot(models.Model):
+    """
+    Materialized budget balance covering every entry up to ``last_entry_id``.
+    """
+
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+    last_entry_id = models.BigIntegerField(unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Budget Snapshot"
+        verbose_name_plural = "Budget Snapshots"
+
+    @classmethod
+    def latest(cls):
+        return cls.objects.order_by("-last_entry_id").first()
+
+    @classmethod
+    def compact(cls, timeout=None):
+        """
+        Roll the ledger entries recorded since the latest snapshot into a new
+        snapshot and return it, or ``None`` when there is nothing to roll up.
+
+        The snapshot ends at the highest committed entry id, once the
+        transactions that could still commit a lower one have ended (see
+        ``wait_for_writers``). When they take longer than ``timeout``
+        seconds, nothing is rolled up this time. Call it outside of any
+        transaction.
+        """
+        if timeout is None:
+            timeout = settings.BUDGET_LEDGER_COMPACTION_TIMEOUT
+        previous = cls.latest()
+        balance = previous.balance if previous else Decimal("0")
+        last_entry_id = previous.last_entry_id if previous else 0
+
+        entries = BudgetEntry.objects.filter(id__gt=last_entry_id)
+        upto = entries.aggregate(upto=Max("id"))["upto"]
+        if upto is None:
+            return None
+        if not cls.wait_for_writers(timeout):
+            logger.info(f"Ledger writers still running, entry {upto} not compacted.")
+            return None
+
+        delta = entries.filter(id__lte=upto).aggregate(delta=Sum("amount"))["delta"]
+        snapshot = cls(balance=balance + (delta or 0), last_entry_id=upto)
+        cls.objects.bulk_create([snapshot], ignore_conflicts=True)
+        return snapshot
+
+    @staticmethod
+    def wait_for_writers(timeout):
+        """
+        Wait until the transactions running now have ended, and return whether
+        they did within ``timeout`` seconds.
+
+        On PostgreSQL ids are allocated before commit, so a transaction still
+        running may commit an id below the highest visible one. Ledger writers
+        get their transaction id before any entry id (``BudgetEntry.begin_write``),
+        so once the oldest running transaction is younger than every
+        transaction id assigned so far, all the entry ids read before are
+        settled. Other databases (SQLite) run one writer at a time and commit
+        ids in order.
+        """
+        if connection.vendor != "postgresql":
+            return True
+        deadline = time.monotonic() + timeout
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT txid_snapshot_xmax(txid_current_snapshot())")
+            horizon = cursor.fetchone()[0]
+            while True:
+                cursor.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+                if cursor.fetchone()[0] >= horizon:
+                    return True
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.1)
+
+
 class BankBudget(models.Model):
-    total_funds = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    """
+    The bank's lendable funds.
+
+    The balance is never stored on this row: funds, disbursements and
+    repayments are appended to the ``BudgetEntry`` ledger and the balance is
+    the latest ``BudgetSnapshot`` plus the entries recorded after it. The row
+    itself is only locked by debits, so credits never wait on each other.
+
+    Debits do serialize on the row, since each balance check has to see every
+    debit before it. They are loan approvals, a personnel action far rarer
+    than repayments, and hold the lock for one balance read and one insert
+    (``benchmark_budget --debits`` measures their throughput).
+    """
 
     def available_funds(self):
-        return self.total_funds
+        snapshot = BudgetSnapshot.latest()
+        balance = snapshot.balance if snapshot else Decimal("0")
+        last_entry_id = snapshot.last_entry_id if snapshot else 0
+        delta = BudgetEntry.objects.filter(id__gt=last_entry_id).aggregate(
+            delta=Sum("amount")
+        )["delta"]
+        return balance + (delta or 0)
 
     def save(self, *args, **kwargs):
         if not self.pk and BankBudget.objects.exists():
             raise ValidationError("There can only be one BankBudget instance.")
         super().save(*args, **kwargs)
 
-    def add_funds(self, amount):
-        self.total_funds += Decimal(amount)
-        self.save()
+    def add_funds(self, amount, kind=BudgetEntry.KIND_FUND, **references):
+        with transaction.atomic():
+            BudgetEntry.begin_write()
+            return BudgetEntry.objects.create(
+                kind=kind, amount=Decimal(amount), **references
+            )
+
+    def withdraw(self, amount, **references):
+        """
+        Record a disbursement of ``amount``, raising ``ValueError`` if the
+        funds are insufficient.
+
+        Debits lock the budget row so two of them cannot both pass the
+        balance check; credits recorded meanwhile only make the check
+        more conservative.
+        """
+        amount = Decimal(amount)
+        with transaction.atomic():
+            self.lock()
+            if self.available_funds() < amount:
+                raise ValueError("Insufficient funds in bank budget.")
+            BudgetEntry.begin_write()
+            return BudgetEntry.objects.create(
+                kind=BudgetEntry.KIND_DISBURSEMENT, amount=-amount, **references
+            )
+
+    def lock(self):
+        """
+        Take the row lock that serializes debits until the transaction ends.
+        """
+        BankBudget.objects.select_for_update().get(pk=self.pk)
 
     @classmethod
     def get_instance(cls, for_update=False):
@@ -46,6 +238,11 @@ class Fund(models.Model):
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="fund_user_created_idx"),
+        ]
+
 
 class Document(models.Model):
     file = models.FileField(upload_to="documents/")
@@ -69,7 +266,57 @@ class Document(models.Model):
     )
 
 
-class LoanRequest(models.Model):
+class CountedStatusMixin:
+    """
+    Keeps ``StatusCounter`` in step with ``status`` whenever an instance is
+    saved. Deletions are counted by a ``post_delete`` receiver, so that queryset
+    and cascading deletes are covered too; bulk updates count themselves.
+    """
+
+    status_counter_kind = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._counted_status = instance.__dict__.get("status")
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        counted = update_fields is None or "status" in update_fields
+        previous = None
+        if counted and not self._state.adding:
+            previous = getattr(self, "_counted_status", None)
+            if previous is None:
+                # Loaded without its status, read the stored one.
+                previous = (
+                    type(self)
+                    .objects.filter(pk=self.pk)
+                    .values_list("status", flat=True)
+                    .first()
+                )
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if counted and previous != self.status:
+                StatusCounter.transition(
+                    self.status_counter_kind, previous, self.status
+                )
+        self._counted_status = self.status
+
+    @classmethod
+    def count_by_status(cls, **filters):
+        """
+        Return ``{status: count}`` over the rows matching ``filters``, with
+        every status present, in one ``GROUP BY`` query.
+        """
+        counts = dict.fromkeys((value for value, _ in cls.STATUS_CHOICES), 0)
+        rows = cls.objects.filter(**filters).order_by().values_list("status")
+        counts.update(rows.annotate(Count("pk")))
+        return counts
+
+
+class LoanRequest(CountedStatusMixin, models.Model):
     STATUS_PENDING_REVIEW = "pending_review"
     STATUS_PENDING_CUSTOMER = "pending_customer"
     STATUS_PENDING_APPROVAL = "pending_approval"
@@ -83,6 +330,13 @@ class LoanRequest(models.Model):
         (STATUS_REJECTED, "Rejected"),
         (STATUS_PENDING_CUSTOMER, "Pending Customer Input"),
     ]
+    OPEN_STATUSES = [
+        STATUS_PENDING_REVIEW,
+        STATUS_PENDING_CUSTOMER,
+        STATUS_PENDING_APPROVAL,
+    ]
+    SEARCH_CONFIG = "english"
+    status_counter_kind = "loan_request"
 
     status = models.CharField(
         max_length=50,
@@ -112,6 +366,71 @@ class LoanRequest(models.Model):
     secured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted purpose (A) and details (B), kept up to date by a database
+    # trigger and GIN indexed on PostgreSQL (see migration 0009).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "created_at", "id"],
+                name="loanreq_status_created_idx",
+            ),
+            models.Index(
+                fields=["customer", "status", "created_at", "id"],
+                name="loanreq_customer_status_idx",
+            ),
+        ]
+
+    @classmethod
+    def search_filter(cls, text):
+        """
+        Return a ``Q`` matching requests whose purpose/details contain the
+        words of ``text``, or whose customer's name, username or email looks
+        like it.
+
+        PostgreSQL uses the GIN indexed ``search_vector`` and the trigram
+        indexes on the users table; other databases fall back to
+        ``icontains`` on every word.
+        """
+        if connection.vendor == "postgresql":
+            query = SearchQuery(text, config=cls.SEARCH_CONFIG, search_type="websearch")
+            customers = User.objects.filter(
+                Q(name__trigram_similar=text)
+                | Q(username__trigram_similar=text)
+                | Q(email__icontains=text)
+            )
+            return Q(search_vector=query) | Q(customer__in=customers.values("pk"))
+
+        condition = Q()
+        for word in text.split():
+            condition &= (
+                Q(purpose__icontains=word)
+                | Q(details__icontains=word)
+                | Q(customer__name__icontains=word)
+                | Q(customer__username__icontains=word)
+                | Q(customer__email__icontains=word)
+            )
+        return condition
+
+    @classmethod
+    def search(cls, text):
+        """
+        Return the requests matching ``text`` (see ``search_filter``), best
+        matches first on PostgreSQL and newest first elsewhere.
+        """
+        queryset = cls.objects.filter(cls.search_filter(text)).defer("search_vector")
+        if connection.vendor != "postgresql":
+            return queryset.order_by("-created_at", "-pk")
+
+        query = SearchQuery(text, config=cls.SEARCH_CONFIG, search_type="websearch")
+        rank = Coalesce(
+            SearchRank(F("search_vector"), query), 0, output_field=FloatField()
+        ) + Greatest(
+            TrigramSimilarity("customer__name", text),
+            TrigramSimilarity("customer__username", text),
+        )
+        return queryset.annotate(rank=rank).order_by("-rank", "-pk")
 
     def can_be_set_by_personnel(self):
         bank_budget = BankBudget.objects.first()
@@ -135,19 +454,7 @@ class LoanRequest(models.Model):
 
     def approve(self, approved_by):
         with transaction.atomic():
-            bank_budget = BankBudget.objects.select_for_update().get(pk=1)
-
             loan_amount = Decimal(self.amount)
-            total_funds = Decimal(bank_budget.total_funds)
-
-            if total_funds < loan_amount:
-                raise ValueError("Insufficient funds in bank budget.")
-
-            bank_budget.total_funds -= loan_amount
-            bank_budget.save()
-
-            self.status = self.STATUS_APPROVED
-            self.save()
 
             loan = Loan.objects.create(
                 customer=self.customer,
@@ -156,18 +463,133 @@ class LoanRequest(models.Model):
                 interest_rate=self.interest_rate,
                 status=Loan.STATUS_IN_PROGRESS,
             )
+            BankBudget.get_instance().withdraw(loan_amount, loan=loan)
+
+            self.status = self.STATUS_APPROVED
+            self.save()
 
             self.documents.update(loan=loan)
 
             logger.info(
                 f"Loan request {self.id} approved by {approved_by.username}. "
-                f"Loan amount: {loan_amount}. Bank total funds updated to {bank_budget.total_funds}."
+                f"Loan amount: {loan_amount}."
             )
 
             return loan
 
+    @classmethod
+    def approve_many(cls, ids, approved_by):
+        """
+        Approve the pending-approval requests in ``ids`` under a single budget
+        lock, in the given order, until the funds run out.
+
+        Returns a result dict per requested id, in request order.
+        """
+        ids = list(dict.fromkeys(ids))
+        results = {
+            pk: {
+                "id": pk,
+                "status": "not_found",
+                "detail": "Loan request not found or not pending approval.",
+            }
+            for pk in ids
+        }
+
+        with transaction.atomic():
+            bank_budget = BankBudget.get_instance()
+            bank_budget.lock()
+            available_funds = bank_budget.available_funds()
+
+            pending = cls.objects.select_for_update().in_bulk(ids, field_name="pk")
+            approved = []
+            for pk in ids:
+                loan_request = pending.get(pk)
+                if (
+                    loan_request is None
+                    or loan_request.status != cls.STATUS_PENDING_APPROVAL
+                ):
+                    continue
+                if loan_request.amount > available_funds:
+                    results[pk] = {
+                        "id": pk,
+                        "status": "insufficient_funds",
+                        "detail": "Insufficient funds in bank budget.",
+                    }
+                    continue
+                available_funds -= loan_request.amount
+                approved.append(loan_request)
+
+            if not approved:
+                return list(results.values())
+
+            loans = [
+                Loan(
+                    customer_id=loan_request.customer_id,
+                    amount=loan_request.amount,
+                    term_months=loan_request.final_duration_months,
+                    interest_rate=loan_request.interest_rate,
+                    status=Loan.STATUS_IN_PROGRESS,
+                )
+                for loan_request in approved
+            ]
+            today = timezone.localdate()
+            for loan in loans:
+                loan.reset_outstanding_balance()
+                loan.due_date = Loan.compute_due_date(today, loan.term_months)
+            Loan.objects.bulk_create(loans)
+            BudgetEntry.begin_write()
+            BudgetEntry.objects.bulk_create(
+                [
+                    BudgetEntry(
+                        kind=BudgetEntry.KIND_DISBURSEMENT,
+                        amount=-loan.amount,
+                        loan=loan,
+                    )
+                    for loan in loans
+                ]
+            )
+
+            approved_ids = [loan_request.pk for loan_request in approved]
+            cls.objects.filter(pk__in=approved_ids).update(
+                status=cls.STATUS_APPROVED, updated_at=timezone.now()
+            )
+            StatusCounter.apply(
+                {
+                    (cls.status_counter_kind, cls.STATUS_PENDING_APPROVAL): -len(
+                        approved
+                    ),
+                    (cls.status_counter_kind, cls.STATUS_APPROVED): len(approved),
+                    (Loan.status_counter_kind, Loan.STATUS_IN_PROGRESS): len(loans),
+                }
+            )
+            Document.objects.filter(loan_request_id__in=approved_ids).update(
+                loan=Case(
+                    *[
+                        When(loan_request_id=loan_request.pk, then=Value(loan.pk))
+                        for loan_request, loan in zip(approved, loans)
+                    ],
+                    output_field=models.BigIntegerField(),
+                ),
+                updated_at=timezone.now(),
+            )
+            cache.invalidate(*(loan.customer_id for loan in loans))
+
+            for loan_request, loan in zip(approved, loans):
+                results[loan_request.pk] = {
+                    "id": loan_request.pk,
+                    "status": "approved",
+                    "loan": loan.pk,
+                }
+
+            logger.info(
+                f"{len(approved)} loan requests approved by {approved_by.username}. "
+                f"Total loan amount: {sum(loan.amount for loan in loans)}."
+            )
+
+        return list(results.values())
+
 
-class Loan(models.Model):
+class Loan(CountedStatusMixin, models.Model):
     STATUS_IN_PROGRESS = "in_progress"
     STATUS_FULLY_PAID = "fully_paid"
     STATUS_OVERDUE = "overdue"
@@ -177,6 +599,8 @@ class Loan(models.Model):
         (STATUS_FULLY_PAID, "Fully Paid"),
         (STATUS_OVERDUE, "Overdue"),
     ]
+    OPEN_STATUSES = [STATUS_IN_PROGRESS, STATUS_OVERDUE]
+    status_counter_kind = "loan"
 
     customer = models.ForeignKey(User, on_delete=models.CASCADE)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
@@ -187,27 +611,109 @@ class Loan(models.Model):
         choices=STATUS_CHOICES,
         default=STATUS_IN_PROGRESS,
     )
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    outstanding_balance = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0
+    )
+    due_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["due_date", "id"],
+                name="loan_open_due_date_idx",
+                condition=Q(status__in=["in_progress", "overdue"]),
+            ),
+            models.Index(
+                fields=["status", "created_at", "id"], name="loan_status_created_idx"
+            ),
+            models.Index(
+                fields=["status", "updated_at", "id"], name="loan_status_updated_idx"
+            ),
+            models.Index(
+                fields=["customer", "status", "created_at", "id"],
+                name="loan_customer_status_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.reset_outstanding_balance()
+            if self.due_date is None:
+                self.due_date = self.compute_due_date(
+                    timezone.localdate(), self.term_months
+                )
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def compute_due_date(start_date, term_months):
+        if not term_months:
+            return None
+        return start_date + relativedelta(months=term_months)
+
     def total_expected_payment(self):
         if self.interest_rate:
             interest_multiplier = Decimal(str(1 + Decimal(self.interest_rate) / 100))
-            return self.amount * interest_multiplier
+            return (self.amount * interest_multiplier).quantize(
+                CENT, rounding=ROUND_HALF_UP
+            )
         return self.amount
 
-    def total_paid(self):
-        return sum(payment.amount_paid for payment in self.loanpayment_set.all())
+    def reset_outstanding_balance(self):
+        self.outstanding_balance = self.total_expected_payment() - self.total_paid
+
+    def record_payment(self, amount):
+        """
+        Add ``amount`` to the paid total with a single conditional UPDATE.
+
+        Returns ``False`` without changing anything when ``amount`` exceeds
+        the outstanding balance, so concurrent payments cannot overpay. The
+        instance is refreshed with the stored balance either way.
+        """
+        updated = Loan.objects.filter(
+            pk=self.pk, outstanding_balance__gte=amount
+        ).update(
+            total_paid=F("total_paid") + amount,
+            outstanding_balance=F("outstanding_balance") - amount,
+            updated_at=timezone.now(),
+        )
+        self.refresh_from_db(fields=["total_paid", "outstanding_balance", "updated_at"])
+        if updated:
+            cache.invalidate(self.customer_id)
+        return bool(updated)
 
     def is_fully_paid(self):
-        return self.total_paid() >= self.total_expected_payment()
+        return self.outstanding_balance <= 0
 
     def has_deadline_passed(self):
-        if self.term_months:
-            end_date = self.created_at + relativedelta(months=self.term_months)
-            return datetime.now().date() > end_date.date()
+        if self.due_date:
+            return timezone.localdate() > self.due_date
         return False
 
+    def next_installment(self, today=None):
+        """
+        Return the date of the next monthly instalment and what has to be paid
+        by then to be on schedule, or ``None`` for a paid off or open-ended
+        loan. Overdue loans owe their whole balance at the due date.
+        """
+        if self.is_fully_paid() or not self.term_months or not self.due_date:
+            return None
+        today = today or timezone.localdate()
+        start = self.due_date - relativedelta(months=self.term_months)
+        for month in range(1, self.term_months + 1):
+            date = start + relativedelta(months=month)
+            if date >= today:
+                break
+        scheduled = (self.total_expected_payment() * month / self.term_months).quantize(
+            CENT, rounding=ROUND_HALF_UP
+        )
+        amount = min(
+            max(scheduled - self.total_paid, Decimal(0)), self.outstanding_balance
+        )
+        return date, amount
+
     def update_status(self):
         if self.is_fully_paid():
             self.status = self.STATUS_FULLY_PAID
@@ -215,10 +721,169 @@ class Loan(models.Model):
             self.status = self.STATUS_OVERDUE
         else:
             self.status = self.STATUS_IN_PROGRESS
-        self.save()
+        self.save(update_fields=["status", "updated_at"])
+
+    @classmethod
+    def sweep_statuses(cls, now=None):
+        """
+        Bring every loan's status in line with its balance and due date with
+        one set-based UPDATE per current and target status, so that the moves
+        can be applied to ``StatusCounter``.
+
+        Returns the number of loans moved to each status.
+        """
+        now = now or timezone.now()
+        loans = cls.objects.all()
+        unpaid = Q(outstanding_balance__gt=0)
+        past_due = Q(due_date__lt=timezone.localdate(now))
+
+        targets = {
+            cls.STATUS_FULLY_PAID: loans.exclude(unpaid),
+            cls.STATUS_OVERDUE: loans.filter(unpaid & past_due),
+            cls.STATUS_IN_PROGRESS: loans.filter(unpaid).exclude(past_due),
+        }
+        statuses = [value for value, _ in cls.STATUS_CHOICES]
+        with transaction.atomic():
+            changes = Counter()
+            moved = dict.fromkeys(targets, 0)
+            for new_status, queryset in targets.items():
+                for old_status in statuses:
+                    if old_status == new_status:
+                        continue
+                    count = queryset.filter(status=old_status).update(
+                        status=new_status, updated_at=now
+                    )
+                    moved[new_status] += count
+                    changes[(cls.status_counter_kind, old_status)] -= count
+                    changes[(cls.status_counter_kind, new_status)] += count
+            if any(moved.values()):
+                StatusCounter.apply(changes)
+                cache.invalidate_all()
+
+        logger.info(f"Loan status sweep moved {moved}.")
+        return moved
 
 
 class LoanPayment(models.Model):
     loan = models.ForeignKey(Loan, on_delete=models.CASCADE)
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2)
     payment_date = models.DateField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["loan", "payment_date"], name="loanpayment_loan_date_idx"
+            ),
+        ]
+
+
+class StatusCounter(models.Model):
+    """
+    Number of loan requests and loans per status, kept up to date on every
+    status change so that the personnel dashboard does not have to count the
+    tables. ``reconcile`` corrects any drift.
+    """
+
+    COUNTED_MODELS = {
+        LoanRequest.status_counter_kind: LoanRequest,
+        Loan.status_counter_kind: Loan,
+    }
+
+    kind = models.CharField(max_length=20)
+    status = models.CharField(max_length=50)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "status"], name="statuscounter_kind_status_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.status}: {self.count}"
+
+    @classmethod
+    def apply(cls, changes):
+        """
+        Add the deltas of ``changes``, a ``{(kind, status): delta}`` dict, to
+        the counters. Rows are updated in a fixed order to avoid deadlocks
+        between concurrent transitions.
+        """
+        for kind, status in sorted(key for key, delta in changes.items() if delta):
+            delta = changes[(kind, status)]
+            counter = cls.objects.filter(kind=kind, status=status)
+            if not counter.update(count=F("count") + delta):
+                cls.objects.get_or_create(kind=kind, status=status)
+                counter.update(count=F("count") + delta)
+
+    @classmethod
+    def transition(cls, kind, old_status, new_status, count=1):
+        """
+        Move ``count`` rows of ``kind`` from ``old_status`` to ``new_status``;
+        either may be ``None`` for a creation or a deletion.
+        """
+        changes = {}
+        if old_status is not None:
+            changes[(kind, old_status)] = -count
+        if new_status is not None:
+            changes[(kind, new_status)] = changes.get((kind, new_status), 0) + count
+        cls.apply(changes)
+
+    @classmethod
+    def snapshot(cls):
+        """
+        Return ``{kind: {status: count}}`` for every status, read in a single
+        query.
+        """
+        result = {
+            kind: {value: 0 for value, _ in model.STATUS_CHOICES}
+            for kind, model in cls.COUNTED_MODELS.items()
+        }
+        for kind, status, count in cls.objects.values_list("kind", "status", "count"):
+            if kind in result:
+                result[kind][status] = count
+        return result
+
+    @classmethod
+    def actual_counts(cls):
+        return {
+            (kind, status): count
+            for kind, model in cls.COUNTED_MODELS.items()
+            for status, count in model.count_by_status().items()
+        }
+
+    @classmethod
+    def reconcile(cls, fix=True):
+        """
+        Compare the counters with a ``GROUP BY`` over the counted tables, and
+        correct them unless ``fix`` is false.
+
+        The counter rows are locked first, so transitions committing meanwhile
+        are either included in the counts or applied on top of the corrected
+        values. Returns the ``(kind, status, stored, actual)`` differences.
+        """
+        with transaction.atomic():
+            stored = {
+                (kind, status): count
+                for kind, status, count in cls.objects.select_for_update()
+                .order_by("kind", "status")
+                .values_list("kind", "status", "count")
+            }
+            actual = cls.actual_counts()
+            differences = [
+                (
+                    kind,
+                    status,
+                    stored.get((kind, status), 0),
+                    actual.get((kind, status), 0),
+                )
+                for kind, status in sorted(stored.keys() | actual.keys())
+                if stored.get((kind, status), 0) != actual.get((kind, status), 0)
+            ]
+            if fix:
+                for kind, status, _, count in differences:
+                    cls.objects.update_or_create(
+                        kind=kind, status=status, defaults={"count": count}
+                    )
+        return differences
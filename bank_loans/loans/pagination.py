@@ -0,0 +1,169 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from bank_loans.loans.counts import approximate_count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over ``(ordering field, id)``.
+
+    The ordering field is the one picked by the view's ``OrderingFilter``
+    (or the view's ``ordering``), with ``id`` as tie-breaker so pages stay
+    stable while rows are inserted. The cursor holds the position of the
+    last row seen, so every page is an index range scan whatever its depth.
+
+    ``count`` is the size of the whole (filtered) list, estimated by the
+    planner on large tables (see ``approximate_count``).
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    ordering = "-created_at"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        window = self.get_window(queryset, request, view)
+        self.count = approximate_count(queryset)
+
+        rows = list(window)
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.backwards:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_window(self, queryset, request, view=None):
+        """
+        Return the rows of the requested page, plus the one after them that
+        tells whether there is a next page, as an unevaluated queryset.
+        """
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request, queryset.model)
+
+        self.backwards = False
+        if self.cursor is not None:
+            value, pk, self.backwards = self.cursor
+            lookup = "lt" if self.descending != self.backwards else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__{lookup}": value})
+                | Q(**{self.field: value, f"pk__{lookup}": pk})
+            )
+
+        descending = self.descending != self.backwards
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.field}", f"{prefix}pk")
+        return queryset[: self.page_size + 1]
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        if view is not None:
+            if OrderingFilter in getattr(view, "filter_backends", []):
+                ordering = OrderingFilter().get_ordering(request, queryset, view)
+            ordering = ordering or getattr(view, "ordering", None)
+        if isinstance(ordering, (list, tuple)):
+            ordering = ordering[0] if ordering else None
+        ordering = ordering or self.ordering
+        return ordering.lstrip("-"), ordering.startswith("-")
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return row[self.field], row["id"]
+        return getattr(row, self.field), row.pk
+
+    def encode_cursor(self, row, backwards):
+        value, pk = self.get_position(row)
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        payload = json.dumps({"v": value, "id": pk, "b": backwards})
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            field = model._meta.get_field(self.field)
+            value = field.to_python(payload["v"])
+            return value, int(payload["id"]), bool(payload["b"])
+        except (binascii.Error, ValidationError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], backwards=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], backwards=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.count,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "example": 123},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
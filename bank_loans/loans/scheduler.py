@@ -0,0 +1,71 @@
+"""
+Minimal scheduler for the loans background jobs (ledger compaction and the
+loan status sweep).
+
+It runs in a dedicated process (the ``run_loans_jobs`` command), never in
+the web workers; every job runs in its own thread. Jobs must still be safe
+to run from several processes at once, as a deployment may briefly run two.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_started = False
+_lock = threading.Lock()
+
+
+class PeriodicJob(threading.Thread):
+    def __init__(self, name, func, interval):
+        super().__init__(name=f"loans-{name}", daemon=True)
+        self.func = func
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            close_old_connections()
+            try:
+                self.func()
+            except Exception:
+                logger.exception(f"Background job {self.name} failed.")
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def get_jobs():
+    from bank_loans.loans.models import BudgetSnapshot
+    from bank_loans.loans.models import Loan
+
+    return [
+        PeriodicJob(
+            "compact-budget-ledger",
+            BudgetSnapshot.compact,
+            settings.BUDGET_LEDGER_COMPACTION_INTERVAL,
+        ),
+        PeriodicJob(
+            "sweep-loan-statuses",
+            Loan.sweep_statuses,
+            settings.LOAN_STATUS_SWEEP_INTERVAL,
+        ),
+    ]
+
+
+def start():
+    global _started
+    with _lock:
+        if _started:
+            return []
+        _started = True
+
+    jobs = get_jobs()
+    for job in jobs:
+        job.start()
+    return jobs
@@ -0,0 +1,54 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from bank_loans.loans import cache
+from bank_loans.loans.models import Document
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanPayment
+from bank_loans.loans.models import LoanRequest
+from bank_loans.loans.models import StatusCounter
+
+
+def related_customer(instance, name):
+    """
+    Return the ``customer_id`` of ``instance.<name>``, without a query when
+    the related object is already loaded.
+    """
+    field = instance._meta.get_field(name)
+    if field.is_cached(instance):
+        related = getattr(instance, name)
+        return related and related.customer_id
+    pk = getattr(instance, field.attname)
+    if pk is None:
+        return None
+    queryset = field.related_model.objects.filter(pk=pk)
+    return queryset.values_list("customer", flat=True).first()
+
+
+@receiver(post_save, sender=LoanRequest)
+@receiver(post_delete, sender=LoanRequest)
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+def invalidate_customer_cache(sender, instance, **kwargs):
+    cache.invalidate(instance.customer_id)
+
+
+@receiver(post_delete, sender=LoanRequest)
+@receiver(post_delete, sender=Loan)
+def decrement_status_counter(sender, instance, **kwargs):
+    StatusCounter.transition(sender.status_counter_kind, instance.status, None)
+
+
+@receiver(post_save, sender=LoanPayment)
+@receiver(post_delete, sender=LoanPayment)
+def invalidate_payment_customer_cache(sender, instance, **kwargs):
+    cache.invalidate(related_customer(instance, "loan"))
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def invalidate_document_customer_cache(sender, instance, **kwargs):
+    cache.invalidate(
+        related_customer(instance, "loan_request"), related_customer(instance, "loan")
+    )
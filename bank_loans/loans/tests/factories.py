@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from factory import Faker
+from factory import SubFactory
+from factory.django import DjangoModelFactory
+
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanRequest
+from bank_loans.users.models import User
+from bank_loans.users.tests.factories import UserFactory
+
+
+class CustomerFactory(UserFactory):
+    username = Faker("user_name")
+    role = User.ROLE_CUSTOMER
+    email_verified = True
+
+
+class PersonnelFactory(UserFactory):
+    username = Faker("user_name")
+    role = User.ROLE_BANK_PERSONNEL
+    email_verified = True
+
+
+class LoanRequestFactory(DjangoModelFactory):
+    customer = SubFactory(CustomerFactory)
+    max_duration_months = 12
+    final_duration_months = 12
+    purpose = Faker("sentence", nb_words=4)
+    details = Faker("paragraph")
+    amount = Decimal("1000.00")
+    interest_rate = 10.0
+
+    class Meta:
+        model = LoanRequest
+
+
+class LoanFactory(DjangoModelFactory):
+    customer = SubFactory(CustomerFactory)
+    amount = Decimal("1000.00")
+    term_months = 12
+    interest_rate = 10.0
+
+    class Meta:
+        model = Loan
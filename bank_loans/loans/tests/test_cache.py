@@ -0,0 +1,84 @@
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from bank_loans.loans import cache
+from bank_loans.loans.models import Document
+from bank_loans.loans.models import Loan
+
+from .factories import LoanFactory
+from .factories import LoanRequestFactory
+
+pytestmark = pytest.mark.django_db
+
+URL = reverse("loans:customer-loans")
+
+
+def loan_ids(client):
+    return [loan["id"] for loan in client.get(URL).data["results"]]
+
+
+class TestCustomerCache:
+    def test_second_read_is_served_from_cache(
+        self, customer, customer_client, personnel_client, django_assert_num_queries
+    ):
+        loan = LoanFactory(customer=customer)
+        assert loan_ids(customer_client) == [loan.pk]
+
+        # Only the conditional request aggregate is left.
+        with django_assert_num_queries(1):
+            assert loan_ids(customer_client) == [loan.pk]
+
+        stats = personnel_client.get(reverse("loans:customer-cache-stats")).data
+        assert stats["customer-loans"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+    def test_invalidated_by_own_changes_only(self, customer, customer_client):
+        loan = LoanFactory(customer=customer)
+        loan_ids(customer_client)
+
+        other = LoanFactory()
+        Document.objects.create(file="documents/a.pdf", title="a", loan=other)
+        LoanRequestFactory()
+        assert loan_ids(customer_client) == [loan.pk]
+
+        newer = LoanFactory(customer=customer)
+        assert loan_ids(customer_client) == [newer.pk, loan.pk]
+
+    def test_invalidated_by_documents_and_payments(self, customer, customer_client):
+        loan = LoanFactory(customer=customer, amount=Decimal("100.00"))
+        customer_client.get(URL)
+
+        Document.objects.create(file="documents/a.pdf", title="a", loan=loan)
+        assert len(customer_client.get(URL).data["results"][0]["documents"]) == 1
+
+        loan.record_payment(Decimal("10.00"))
+        Loan.objects.filter(pk=loan.pk).update(due_date=timezone.localdate())
+        Loan.sweep_statuses(now=timezone.now() + timedelta(days=1))
+        result = customer_client.get(URL).data["results"][0]
+        assert result["status"] == Loan.STATUS_OVERDUE
+
+    def test_invalidation_during_render_is_not_overwritten(
+        self, customer, customer_client, monkeypatch
+    ):
+        loan = LoanFactory(customer=customer)
+        set_response = cache.set_response
+        newer = []
+
+        def commit_then_set(key, data):
+            # A write commits after the rows were read, before they are cached.
+            newer.append(LoanFactory(customer=customer))
+            set_response(key, data)
+
+        monkeypatch.setattr(cache, "set_response", commit_then_set)
+        assert loan_ids(customer_client) == [loan.pk]
+        monkeypatch.setattr(cache, "set_response", set_response)
+
+        assert loan_ids(customer_client) == [newer[0].pk, loan.pk]
+
+    def test_stats_require_personnel(self, customer_client):
+        response = customer_client.get(reverse("loans:customer-cache-stats"))
+        assert response.status_code == HTTPStatus.FORBIDDEN
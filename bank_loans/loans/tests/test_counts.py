@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+import pytest
+from django.urls import reverse
+
+from bank_loans.loans import counts
+from bank_loans.loans.models import Loan
+
+from .factories import LoanFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestApproximateCount:
+    def test_exact_without_estimate(self):
+        LoanFactory.create_batch(3)
+        assert counts.estimate_count(Loan.objects.all()) is None
+        assert counts.approximate_count(Loan.objects.all()) == 3
+
+    def test_estimate_above_threshold(self, monkeypatch, settings):
+        settings.APPROXIMATE_COUNT_THRESHOLD = 1000
+        LoanFactory.create_batch(2)
+
+        monkeypatch.setattr(counts, "estimate_count", lambda queryset: 50000)
+        assert counts.approximate_count(Loan.objects.all()) == 50000
+
+        monkeypatch.setattr(counts, "estimate_count", lambda queryset: 999)
+        assert counts.approximate_count(Loan.objects.all()) == 2
+
+    def test_list_count(self, personnel_client):
+        LoanFactory.create_batch(3)
+        LoanFactory(status=Loan.STATUS_FULLY_PAID)
+
+        response = personnel_client.get(
+            reverse("loans:personnel-loans"),
+            {"status": Loan.STATUS_IN_PROGRESS, "page_size": 2},
+        )
+
+        assert response.data["count"] == 3
+        assert len(response.data["results"]) == 2
+
+    def test_admin_changelist(self, admin_client, monkeypatch):
+        LoanFactory()
+        monkeypatch.setattr(counts, "estimate_count", lambda queryset: 10**7)
+
+        response = admin_client.get(reverse("admin:loans_loan_changelist"))
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.context["cl"].result_count == 10**7
@@ -0,0 +1,95 @@
+import csv
+import json
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanPayment
+
+from .factories import LoanFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def export_url(name, file_format):
+    return reverse("loans:export", kwargs={"name": name, "file_format": file_format})
+
+
+def content(response):
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+
+class TestExportView:
+    def test_csv_filtered_by_status_and_date(self, personnel_client):
+        loan = LoanFactory(amount=Decimal("250.00"))
+        LoanFactory(status=Loan.STATUS_FULLY_PAID)
+        old = LoanFactory()
+        Loan.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+        today = timezone.localdate()
+
+        response = personnel_client.get(
+            export_url("loans", "csv"),
+            {"status": Loan.STATUS_IN_PROGRESS, "date_from": today, "date_to": today},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response["Content-Type"] == "text/csv"
+        rows = list(csv.DictReader(content(response).splitlines()))
+        assert [row["id"] for row in rows] == [str(loan.pk)]
+        assert rows[0]["amount"] == "250.00"
+        assert rows[0]["status"] == Loan.STATUS_IN_PROGRESS
+
+    def test_ndjson_payments(self, personnel_client):
+        loan = LoanFactory()
+        payment = LoanPayment.objects.create(loan=loan, amount_paid=Decimal("10.5"))
+
+        response = personnel_client.get(export_url("payments", "ndjson"))
+
+        lines = content(response).splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {
+                "id": payment.pk,
+                "loan": loan.pk,
+                "amount_paid": "10.50",
+                "payment_date": timezone.localdate().isoformat(),
+            }
+        ]
+
+    def test_invalid_filters(self, personnel_client):
+        no_status = personnel_client.get(
+            export_url("payments", "csv"), {"status": "in_progress"}
+        )
+        reversed_range = personnel_client.get(
+            export_url("loans", "csv"),
+            {"date_from": "2024-02-01", "date_to": "2024-01-01"},
+        )
+        unknown = personnel_client.get(export_url("users", "csv"))
+
+        assert no_status.status_code == HTTPStatus.BAD_REQUEST
+        assert reversed_range.status_code == HTTPStatus.BAD_REQUEST
+        assert unknown.status_code == HTTPStatus.NOT_FOUND
+
+    def test_requires_personnel(self, customer_client):
+        response = customer_client.get(export_url("loans", "csv"))
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_export_command(tmp_path):
+    loans = LoanFactory.create_batch(3)
+    output = tmp_path / "loans.ndjson"
+
+    call_command(
+        "export_portfolio", "loans", format="ndjson", output=str(output), chunk_size=2
+    )
+
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [row["id"] for row in rows] == [loan.pk for loan in loans]
@@ -0,0 +1,131 @@
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from django.db import DatabaseError
+
+from bank_loans.loans.imports import FORMAT_CSV
+from bank_loans.loans.imports import FORMAT_NDJSON
+from bank_loans.loans.imports import PaymentImport
+from bank_loans.loans.imports import as_text
+from bank_loans.loans.imports import read_rows
+from bank_loans.loans.models import BankBudget
+from bank_loans.loans.models import BudgetEntry
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanPayment
+from bank_loans.loans.models import StatusCounter
+
+from .factories import LoanFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_csv_import():
+    loan = LoanFactory(amount=Decimal("1000.00"), interest_rate=10.0)
+    paid_off = LoanFactory(amount=Decimal("100.00"), interest_rate=None)
+    stream = io.StringIO(
+        "loan,amount_paid\n"
+        f"{loan.pk},100.00\n"
+        f"{loan.pk},1000.01\n"
+        f"{paid_off.pk},60\n"
+        f"{paid_off.pk},40\n"
+        "999999,10\n"
+        f"{loan.pk},-5\n"
+        "oops\n"
+    )
+
+    report = PaymentImport(batch_size=2).run(read_rows(stream, FORMAT_CSV))
+
+    assert report["imported"] == 3
+    assert report["total_amount"] == "200.00"
+    assert [error["line"] for error in report["errors"]] == [3, 6, 7, 8]
+    assert LoanPayment.objects.filter(loan=loan).count() == 1
+    paid_off.refresh_from_db()
+    assert paid_off.status == Loan.STATUS_FULLY_PAID
+    # One credit per batch with payments.
+    assert BudgetEntry.objects.filter(kind=BudgetEntry.KIND_REPAYMENT).count() == 2
+    assert BankBudget.get_instance().available_funds() == Decimal("200.00")
+    assert StatusCounter.reconcile(fix=False) == []
+
+
+def test_ndjson_import():
+    loan = LoanFactory()
+    stream = io.StringIO(
+        f'{{"loan": {loan.pk}, "amount_paid": "25.50"}}\n' "\n" "not json\n"
+    )
+
+    report = PaymentImport().run(read_rows(stream, FORMAT_NDJSON))
+
+    assert report["imported"] == 1
+    assert report["errors"] == [{"line": 3, "error": "Malformed row."}]
+
+
+def test_failed_batch_keeps_the_others(monkeypatch):
+    first, second = LoanFactory.create_batch(2)
+    update_loans = PaymentImport.update_loans
+
+    def fail_on_second(self, loans, remaining):
+        if second in loans:
+            raise DatabaseError("boom")
+        update_loans(self, loans, remaining)
+
+    monkeypatch.setattr(PaymentImport, "update_loans", fail_on_second)
+    stream = io.StringIO(
+        "loan,amount_paid\n"
+        f"{first.pk},10\n"
+        f"{second.pk},10\n"
+        "99999999999999999999,10\n"
+    )
+
+    report = PaymentImport(batch_size=1).run(read_rows(stream, FORMAT_CSV))
+
+    assert report["imported"] == 1
+    assert report["total_amount"] == "10.00"
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert list(LoanPayment.objects.values_list("loan_id", flat=True)) == [first.pk]
+    assert BankBudget.get_instance().available_funds() == Decimal("10.00")
+
+
+def test_invalid_values():
+    loan = LoanFactory()
+    rows = [
+        {"loan": 1.9, "amount_paid": "10"},
+        {"loan": True, "amount_paid": "10"},
+        {"loan": "1.9", "amount_paid": "10"},
+        {"loan": loan.pk, "amount_paid": "0.004"},
+        {"loan": loan.pk, "amount_paid": "1e30"},
+        {"loan": loan.pk, "amount_paid": "NaN"},
+        {"loan": str(loan.pk), "amount_paid": 10},
+    ]
+    stream = io.StringIO("".join(json.dumps(row) + "\n" for row in rows))
+
+    report = PaymentImport().run(read_rows(stream, FORMAT_NDJSON))
+
+    assert report["imported"] == 1
+    assert [error["line"] for error in report["errors"]] == [1, 2, 3, 4, 5, 6]
+    assert report["errors"][3]["error"] == (
+        "The payment amount must be greater than zero."
+    )
+
+
+def test_unreadable_file():
+    loan = LoanFactory()
+    stream = io.BytesIO(b"loan,amount_paid\n" + f"{loan.pk},10\n".encode() + b"\xff\n")
+
+    report = PaymentImport().run(read_rows(as_text(stream), FORMAT_CSV))
+
+    assert report["imported"] == 0
+    assert [error["line"] for error in report["errors"]] == [1]
+
+
+def test_malformed_csv():
+    loan = LoanFactory()
+    stream = io.StringIO(
+        "loan,amount_paid\n" f"{loan.pk},10\n" f'{loan.pk},"{"1" * 200000}"\n'
+    )
+
+    report = PaymentImport().run(read_rows(stream, FORMAT_CSV))
+
+    assert report["imported"] == 1
+    assert [error["line"] for error in report["errors"]] == [3]
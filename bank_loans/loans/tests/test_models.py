@@ -0,0 +1,253 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from dateutil.relativedelta import relativedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db import transaction
+from django.utils import timezone
+
+from bank_loans.loans import balances
+from bank_loans.loans.models import BankBudget
+from bank_loans.loans.models import BudgetEntry
+from bank_loans.loans.models import BudgetSnapshot
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanPayment
+from bank_loans.loans.models import LoanRequest
+from bank_loans.loans.models import StatusCounter
+
+from .factories import LoanFactory
+from .factories import LoanRequestFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestBankBudget:
+    def test_available_funds_sums_ledger(self):
+        budget = BankBudget.get_instance()
+        for _ in range(10):
+            budget.add_funds("10.50")
+        assert budget.available_funds() == Decimal("105.00")
+        assert BudgetEntry.objects.count() == 10
+
+    def test_withdraw_records_disbursement(self):
+        budget = BankBudget.get_instance()
+        budget.add_funds(100)
+
+        entry = budget.withdraw(90)
+
+        assert entry.kind == BudgetEntry.KIND_DISBURSEMENT
+        assert entry.amount == Decimal("-90")
+        assert budget.available_funds() == Decimal("10")
+
+    def test_withdraw_insufficient_funds(self):
+        budget = BankBudget.get_instance()
+        budget.add_funds(50)
+        with pytest.raises(ValueError, match="Insufficient funds"):
+            budget.withdraw(51)
+        assert budget.available_funds() == Decimal("50")
+
+
+class TestBudgetSnapshot:
+    def test_compact_rolls_entries_into_snapshot(self):
+        budget = BankBudget.get_instance()
+        budget.add_funds(100)
+        budget.withdraw(30)
+
+        snapshot = BudgetSnapshot.compact()
+
+        assert snapshot.balance == Decimal("70")
+        assert snapshot.last_entry_id == BudgetEntry.objects.latest("id").id
+        assert BudgetSnapshot.compact() is None
+
+        budget.add_funds(5)
+        assert budget.available_funds() == Decimal("75")
+
+    def test_compact_gives_up_on_running_writers(self, monkeypatch):
+        BankBudget.get_instance().add_funds(100)
+        monkeypatch.setattr(BudgetSnapshot, "wait_for_writers", lambda timeout: False)
+
+        assert BudgetSnapshot.compact() is None
+        assert not BudgetSnapshot.objects.exists()
+
+    @pytest.mark.skipif(
+        connection.vendor != "postgresql", reason="needs concurrent writers"
+    )
+    @pytest.mark.django_db(transaction=True)
+    def test_entry_committed_after_compaction_started(self):
+        budget = BankBudget.get_instance()
+        inserted = threading.Event()
+        release = threading.Event()
+
+        def pay():
+            try:
+                with transaction.atomic():
+                    budget.add_funds(5)
+                    inserted.set()
+                    release.wait(5)
+            finally:
+                connection.close()
+
+        payer = threading.Thread(target=pay)
+        payer.start()
+        assert inserted.wait(5)
+        # Committed with a higher id while the first entry is still in flight.
+        budget.add_funds(100)
+        threading.Timer(0.5, release.set).start()
+
+        snapshot = BudgetSnapshot.compact(timeout=5)
+        payer.join()
+
+        assert snapshot.balance == Decimal("105")
+        assert budget.available_funds() == Decimal("105")
+
+
+class TestLoanRequestApprove:
+    def test_approve_creates_loan_and_debits_budget(self, admin_user):
+        BankBudget.get_instance().add_funds(5000)
+        loan_request = LoanRequestFactory(
+            status=LoanRequest.STATUS_PENDING_APPROVAL, amount=Decimal("1200.00")
+        )
+
+        loan = loan_request.approve(admin_user)
+
+        loan_request.refresh_from_db()
+        assert loan_request.status == LoanRequest.STATUS_APPROVED
+        assert loan.status == Loan.STATUS_IN_PROGRESS
+        assert loan.amount == Decimal("1200.00")
+        assert BankBudget.get_instance().available_funds() == Decimal("3800.00")
+
+
+class TestLoanBalance:
+    def test_new_loan_owes_expected_payment(self):
+        loan = LoanFactory(amount=Decimal("1000.00"), interest_rate=10.5)
+        assert loan.total_paid == 0
+        assert loan.outstanding_balance == Decimal("1105.00")
+
+    def test_new_loan_due_date(self):
+        loan = LoanFactory(term_months=3)
+        assert loan.due_date == timezone.localdate() + relativedelta(months=3)
+        assert LoanFactory(term_months=None).due_date is None
+
+    def test_record_payment(self):
+        loan = LoanFactory(amount=Decimal("100.00"), interest_rate=None)
+
+        assert loan.record_payment(Decimal("60.00"))
+        assert not loan.record_payment(Decimal("40.01"))
+        assert loan.record_payment(Decimal("40.00"))
+
+        assert loan.total_paid == Decimal("100.00")
+        assert loan.is_fully_paid()
+
+    def test_next_installment(self):
+        loan = LoanFactory(amount=Decimal("1200.00"), interest_rate=None)
+        start = loan.due_date - relativedelta(months=12)
+
+        assert loan.next_installment(start) == (
+            start + relativedelta(months=1),
+            Decimal("100.00"),
+        )
+        loan.record_payment(Decimal("150.00"))
+        assert loan.next_installment(start + relativedelta(months=2, days=1)) == (
+            start + relativedelta(months=3),
+            Decimal("150.00"),
+        )
+        assert loan.next_installment(loan.due_date + timedelta(days=1)) == (
+            loan.due_date,
+            Decimal("1050.00"),
+        )
+
+    def test_rebuild_and_check(self):
+        loan = LoanFactory(amount=Decimal("100.00"), interest_rate=None)
+        LoanPayment.objects.create(loan=loan, amount_paid=Decimal("30.00"))
+
+        assert [pk for pk, _, _ in balances.find_mismatches()] == [loan.pk]
+        assert balances.rebuild(chunk_size=1) == 1
+        assert list(balances.find_mismatches()) == []
+
+        loan.refresh_from_db()
+        assert loan.total_paid == Decimal("30.00")
+        assert loan.outstanding_balance == Decimal("70.00")
+
+
+class TestSweepStatuses:
+    def test_sweep(self):
+        overdue = LoanFactory(term_months=1)
+        current = LoanFactory(term_months=12, status=Loan.STATUS_OVERDUE)
+        paid = LoanFactory(term_months=1)
+        open_ended = LoanFactory(term_months=None)
+        Loan.objects.filter(pk__in=[overdue.pk, paid.pk]).update(
+            due_date=timezone.localdate() - timedelta(days=1)
+        )
+        Loan.objects.filter(pk=paid.pk).update(outstanding_balance=0)
+
+        moved = Loan.sweep_statuses()
+
+        assert moved == {
+            Loan.STATUS_FULLY_PAID: 1,
+            Loan.STATUS_OVERDUE: 1,
+            Loan.STATUS_IN_PROGRESS: 1,
+        }
+        statuses = dict(Loan.objects.values_list("pk", "status"))
+        assert statuses == {
+            overdue.pk: Loan.STATUS_OVERDUE,
+            current.pk: Loan.STATUS_IN_PROGRESS,
+            paid.pk: Loan.STATUS_FULLY_PAID,
+            open_ended.pk: Loan.STATUS_IN_PROGRESS,
+        }
+        assert Loan.sweep_statuses() == {
+            Loan.STATUS_FULLY_PAID: 0,
+            Loan.STATUS_OVERDUE: 0,
+            Loan.STATUS_IN_PROGRESS: 0,
+        }
+
+
+class TestStatusCounter:
+    def test_transitions_are_counted(self, admin_user):
+        BankBudget.get_instance().add_funds(5000)
+        rejected = LoanRequestFactory()
+        rejected.status = LoanRequest.STATUS_REJECTED
+        rejected.save()
+        single = LoanRequestFactory(status=LoanRequest.STATUS_PENDING_APPROVAL)
+        bulk = LoanRequestFactory(status=LoanRequest.STATUS_PENDING_APPROVAL)
+        LoanRequestFactory(status=LoanRequest.STATUS_PENDING_CUSTOMER)
+
+        loan = single.approve(admin_user)
+        LoanRequest.approve_many([bulk.pk], admin_user)
+        loan.record_payment(loan.outstanding_balance)
+        loan.update_status()
+        overdue = LoanFactory(term_months=1)
+        Loan.objects.filter(pk=overdue.pk).update(
+            due_date=timezone.localdate() - timedelta(days=1)
+        )
+        Loan.sweep_statuses()
+        LoanFactory().delete()
+        LoanRequest.objects.filter(pk=rejected.pk).delete()
+
+        counts = StatusCounter.snapshot()
+        assert counts["loan_request"] == {
+            LoanRequest.STATUS_PENDING_REVIEW: 0,
+            LoanRequest.STATUS_PENDING_CUSTOMER: 1,
+            LoanRequest.STATUS_PENDING_APPROVAL: 0,
+            LoanRequest.STATUS_APPROVED: 2,
+            LoanRequest.STATUS_REJECTED: 0,
+        }
+        assert counts["loan"] == {
+            Loan.STATUS_IN_PROGRESS: 1,
+            Loan.STATUS_FULLY_PAID: 1,
+            Loan.STATUS_OVERDUE: 1,
+        }
+        assert StatusCounter.reconcile(fix=False) == []
+
+    def test_reconcile(self):
+        LoanFactory.create_batch(2)
+        StatusCounter.objects.filter(status=Loan.STATUS_IN_PROGRESS).update(count=5)
+
+        with pytest.raises(CommandError):
+            call_command("reconcile_status_counters", "--check")
+        assert StatusCounter.reconcile() == [("loan", Loan.STATUS_IN_PROGRESS, 5, 2)]
+        call_command("reconcile_status_counters", "--check")
+        assert StatusCounter.snapshot()["loan"][Loan.STATUS_IN_PROGRESS] == 2
@@ -0,0 +1,162 @@
+"""
+Query-count and query-plan guards for the loans API.
+
+Every endpoint is requested with 1, 100 and 1000 rows (or documents) behind
+it and must stay under a fixed ceiling, so a missing ``select_related`` /
+``prefetch_related`` shows up as a failure instead of as a slow page.
+To cover a new endpoint, add it to ``LIST_ENDPOINTS`` or ``DETAIL_ENDPOINTS``.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from bank_loans.loans.models import Document
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanRequest
+
+pytestmark = pytest.mark.django_db
+
+ROW_COUNTS = [1, 100, 1000]
+PAGE_SIZE = 500
+
+# (url name, client fixture, model, days until due, query ceiling)
+# Every list GET costs the conditional request aggregate, the count, the page
+# and its documents; a detail GET the aggregate, the object and its documents.
+LIST_ENDPOINTS = [
+    ("loans:personnel-loan-requests", "personnel_client", LoanRequest, None, 4),
+    ("loans:personnel-loans", "personnel_client", Loan, 10, 4),
+    ("loans:personnel-loans-upcoming", "personnel_client", Loan, 10, 4),
+    ("loans:personnel-loans-past-due", "personnel_client", Loan, -10, 4),
+    ("loans:customer-loan-requests", "customer_client", LoanRequest, None, 4),
+    ("loans:customer-loans", "customer_client", Loan, 10, 4),
+]
+
+# (url name, model, query ceiling)
+DETAIL_ENDPOINTS = [
+    ("loans:request-status", LoanRequest, 3),
+    ("loans:loan-status", Loan, 3),
+]
+
+
+def seed(model, customer, rows, due_in=None):
+    """
+    Insert ``rows`` objects of ``model`` owned by ``customer``, each with one
+    attached document.
+    """
+    if model is LoanRequest:
+        objects = [
+            LoanRequest(
+                customer=customer,
+                max_duration_months=12,
+                purpose="Car",
+                details="Details",
+                amount=Decimal("1000.00"),
+            )
+            for _ in range(rows)
+        ]
+        relation = "loan_request"
+    else:
+        due_date = timezone.localdate() + timedelta(days=due_in or 0)
+        objects = [
+            Loan(
+                customer=customer,
+                amount=Decimal("1000.00"),
+                term_months=12,
+                outstanding_balance=Decimal("1000.00"),
+                due_date=due_date,
+            )
+            for _ in range(rows)
+        ]
+        relation = "loan"
+
+    objects = model.objects.bulk_create(objects)
+    Document.objects.bulk_create(
+        Document(file="documents/id.pdf", title="id", **{relation: obj})
+        for obj in objects
+    )
+    return objects
+
+
+def attach_documents(obj, relation, count):
+    Document.objects.bulk_create(
+        Document(file="documents/id.pdf", title=f"doc {i}", **{relation: obj})
+        for i in range(count)
+    )
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+@pytest.mark.parametrize(
+    ("url_name", "client_fixture", "model", "due_in", "ceiling"), LIST_ENDPOINTS
+)
+def test_list_query_ceiling(
+    request,
+    customer,
+    django_assert_max_num_queries,
+    rows,
+    url_name,
+    client_fixture,
+    model,
+    due_in,
+    ceiling,
+):
+    client = request.getfixturevalue(client_fixture)
+    seed(model, customer, rows, due_in)
+
+    with django_assert_max_num_queries(ceiling):
+        response = client.get(reverse(url_name), {"page_size": PAGE_SIZE})
+
+    assert response.status_code == HTTPStatus.OK
+    results = response.data["results"]
+    assert len(results) == min(rows, PAGE_SIZE)
+    assert all(len(result["documents"]) == 1 for result in results)
+
+
+@pytest.mark.parametrize("documents", ROW_COUNTS)
+@pytest.mark.parametrize(("url_name", "model", "ceiling"), DETAIL_ENDPOINTS)
+def test_detail_query_ceiling(
+    customer,
+    customer_client,
+    django_assert_max_num_queries,
+    documents,
+    url_name,
+    model,
+    ceiling,
+):
+    (obj,) = seed(model, customer, 1, due_in=10)
+    relation = "loan_request" if model is LoanRequest else "loan"
+    attach_documents(obj, relation, documents - 1)
+
+    with django_assert_max_num_queries(ceiling):
+        response = customer_client.get(reverse(url_name, kwargs={"pk": obj.pk}))
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.data["documents"]) == documents
+
+
+@pytest.mark.parametrize("rows", ROW_COUNTS)
+def test_dashboard_query_ceiling(
+    customer, customer_client, django_assert_max_num_queries, rows
+):
+    seed(LoanRequest, customer, rows)
+    seed(Loan, customer, rows, due_in=10)
+
+    # Open requests, their documents, loans and the two status counts.
+    with django_assert_max_num_queries(5):
+        response = customer_client.get(reverse("loans:customer-dashboard"))
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.data["requests"]) == rows
+    assert len(response.data["loans"]) == rows
+
+
+def test_list_views_use_their_indexes():
+    out = StringIO()
+    call_command("check_query_plans", stdout=out)
+    assert "FAIL" not in out.getvalue()
@@ -0,0 +1,87 @@
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from bank_loans.loans.api.serializers import LoanRequestSerializer
+from bank_loans.loans.api.serializers import LoanSerializer
+from bank_loans.loans.api.values import ValuesSerializer
+from bank_loans.loans.models import Document
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanRequest
+
+from .factories import LoanFactory
+from .factories import LoanRequestFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def render_both(serializer_class, queryset):
+    request = Request(APIRequestFactory().get("/"))
+    context = {"request": request}
+    expected = serializer_class(queryset, many=True, context=context).data
+
+    values = ValuesSerializer(serializer_class, context)
+    actual = values.to_representation(values.values(queryset))
+
+    renderer = JSONRenderer()
+    return renderer.render(expected), renderer.render(actual)
+
+
+class TestValuesSerializer:
+    def test_loan_requests_match_model_serializer(self):
+        first = LoanRequestFactory(
+            min_amount=Decimal("10.5"),
+            max_amount=None,
+            interest_rate=None,
+            final_duration_months=None,
+        )
+        second = LoanRequestFactory(amount=Decimal("1234.56"), secured=True)
+        LoanRequestFactory()
+        for title in ["id", "salary"]:
+            Document.objects.create(
+                file="documents/id card.pdf", title=title, loan_request=first
+            )
+        Document.objects.create(file="", title="empty", loan_request=second)
+
+        expected, actual = render_both(
+            LoanRequestSerializer,
+            LoanRequest.objects.prefetch_related("documents").order_by("pk"),
+        )
+
+        assert actual == expected
+
+    def test_loans_match_model_serializer(self):
+        loan = LoanFactory(amount=Decimal("99.90"), interest_rate=7.25)
+        LoanFactory(term_months=None, interest_rate=None)
+        Document.objects.create(file="documents/contract.pdf", title="c", loan=loan)
+
+        expected, actual = render_both(
+            LoanSerializer, Loan.objects.prefetch_related("documents").order_by("pk")
+        )
+
+        assert actual == expected
+
+    def test_empty_queryset(self):
+        expected, actual = render_both(LoanSerializer, Loan.objects.none())
+        assert actual == expected == b"[]"
+
+
+def test_list_view_matches_model_serializer(personnel_client):
+    loans = LoanFactory.create_batch(3)
+    Document.objects.create(file="documents/a.pdf", title="a", loan=loans[1])
+
+    response = personnel_client.get(reverse("loans:personnel-loans"))
+
+    request = Request(response.wsgi_request)
+    expected = LoanSerializer(
+        sorted(loans, key=lambda loan: loan.pk, reverse=True),
+        many=True,
+        context={"request": request},
+    ).data
+    assert JSONRenderer().render(response.data["results"]) == (
+        JSONRenderer().render(expected)
+    )
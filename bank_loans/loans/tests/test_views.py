@@ -0,0 +1,511 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+
+import pytest
+from dateutil.relativedelta import relativedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from bank_loans.loans.api.serializers import LoanPaymentSerializer
+from bank_loans.loans.models import BankBudget
+from bank_loans.loans.models import Document
+from bank_loans.loans.models import Loan
+from bank_loans.loans.models import LoanRequest
+from bank_loans.loans.models import StatusCounter
+
+from .factories import CustomerFactory
+from .factories import LoanFactory
+from .factories import LoanRequestFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TestBulkAcceptLoanRequestView:
+    url = reverse("loans:bulk-accept-loan-requests")
+
+    def test_approves_until_funds_run_out(self, personnel_client):
+        BankBudget.get_instance().add_funds(2500)
+        first, second, third = LoanRequestFactory.create_batch(
+            3, status=LoanRequest.STATUS_PENDING_APPROVAL, amount=Decimal("1000.00")
+        )
+        rejected = LoanRequestFactory(status=LoanRequest.STATUS_REJECTED)
+        document = Document.objects.create(
+            file=SimpleUploadedFile("id.pdf", b"pdf"), title="id", loan_request=second
+        )
+
+        response = personnel_client.post(
+            self.url,
+            {"ids": [first.pk, second.pk, third.pk, rejected.pk, 999999]},
+            format="json",
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.data["approved"] == 2
+        statuses = [result["status"] for result in response.data["results"]]
+        assert statuses == [
+            "approved",
+            "approved",
+            "insufficient_funds",
+            "not_found",
+            "not_found",
+        ]
+        first.refresh_from_db()
+        third.refresh_from_db()
+        assert first.status == LoanRequest.STATUS_APPROVED
+        assert third.status == LoanRequest.STATUS_PENDING_APPROVAL
+        document.refresh_from_db()
+        assert document.loan_id == response.data["results"][1]["loan"]
+        assert Loan.objects.count() == 2
+        assert BankBudget.get_instance().available_funds() == Decimal("500.00")
+
+    def test_ids_beyond_the_bigint_range(self, personnel_client):
+        response = personnel_client.post(self.url, {"ids": [2**63]}, format="json")
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert "ids" in response.data
+
+    def test_requires_personnel(self, customer_client):
+        response = customer_client.post(self.url, {"ids": [1]}, format="json")
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+class TestLoanPaymentView:
+    def test_payment_updates_balance_and_budget(self, customer, customer_client):
+        loan = LoanFactory(
+            customer=customer, amount=Decimal("100.00"), interest_rate=None
+        )
+        url = reverse("loans:loan-payment", kwargs={"pk": loan.pk})
+
+        response = customer_client.post(url, {"amount_paid": "100.00"})
+
+        assert response.status_code == HTTPStatus.CREATED
+        loan.refresh_from_db()
+        assert loan.outstanding_balance == 0
+        assert loan.status == Loan.STATUS_FULLY_PAID
+        assert BankBudget.get_instance().available_funds() == Decimal("100.00")
+
+    def test_payment_exceeding_balance(self, customer, customer_client):
+        loan = LoanFactory(
+            customer=customer, amount=Decimal("100.00"), interest_rate=None
+        )
+        url = reverse("loans:loan-payment", kwargs={"pk": loan.pk})
+
+        response = customer_client.post(url, {"amount_paid": "100.01"})
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not loan.loanpayment_set.exists()
+
+    @pytest.mark.skipif(
+        connection.vendor != "postgresql", reason="needs concurrent writers"
+    )
+    @pytest.mark.django_db(transaction=True)
+    def test_sweep_waits_for_payment(self, customer, customer_client, monkeypatch):
+        loan = LoanFactory(customer=customer)
+        Loan.objects.filter(pk=loan.pk).update(
+            due_date=timezone.localdate() - timedelta(days=1)
+        )
+        url = reverse("loans:loan-payment", kwargs={"pk": loan.pk})
+        paying = threading.Event()
+        release = threading.Event()
+
+        def transfer(self, amount, loan):
+            paying.set()
+            return release.wait(5)
+
+        def pay():
+            try:
+                customer_client.post(url, {"amount_paid": "10.00"})
+            finally:
+                connection.close()
+
+        monkeypatch.setattr(LoanPaymentSerializer, "simulate_fund_transfer", transfer)
+        payer = threading.Thread(target=pay)
+        payer.start()
+        assert paying.wait(5)
+        threading.Timer(0.5, release.set).start()
+
+        # Blocks on the loan until the payment has moved it to overdue.
+        moved = Loan.sweep_statuses()
+        payer.join()
+
+        assert moved[Loan.STATUS_OVERDUE] == 0
+        assert StatusCounter.reconcile(fix=False) == []
+
+
+class TestMaturityViews:
+    def test_upcoming_and_past_due(self, personnel_client):
+        today = timezone.localdate()
+        soon = LoanFactory(due_date=today + timedelta(days=5))
+        LoanFactory(due_date=today + timedelta(days=60))
+        late = LoanFactory(due_date=today - timedelta(days=1))
+        LoanFactory(due_date=today - timedelta(days=1), status=Loan.STATUS_FULLY_PAID)
+
+        upcoming = personnel_client.get(
+            reverse("loans:personnel-loans-upcoming"), {"days": 10}
+        )
+        past_due = personnel_client.get(reverse("loans:personnel-loans-past-due"))
+
+        assert [loan["id"] for loan in upcoming.data["results"]] == [soon.pk]
+        assert [loan["id"] for loan in past_due.data["results"]] == [late.pk]
+
+
+class TestKeysetPagination:
+    url = reverse("loans:personnel-loans")
+
+    def walk(self, client, params):
+        ids, url = [], self.url
+        while url:
+            response = client.get(url, params)
+            assert response.status_code == HTTPStatus.OK
+            ids += [loan["id"] for loan in response.data["results"]]
+            url, params = response.data["next"], None
+        return ids
+
+    def test_walks_all_pages_in_order(self, personnel_client):
+        loans = LoanFactory.create_batch(7)
+        Loan.objects.filter(pk__in=[loan.pk for loan in loans[:4]]).update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+        Loan.objects.filter(pk=loans[0].pk).update(status=Loan.STATUS_OVERDUE)
+
+        newest_first = self.walk(personnel_client, {"page_size": 2})
+        oldest_first = self.walk(
+            personnel_client, {"page_size": 3, "ordering": "created_at"}
+        )
+        in_progress = self.walk(
+            personnel_client, {"page_size": 2, "status": Loan.STATUS_IN_PROGRESS}
+        )
+
+        pks = [loan.pk for loan in loans]
+        assert newest_first == pks[4:][::-1] + pks[:4][::-1]
+        assert oldest_first == pks[:4] + pks[4:]
+        assert in_progress == [pk for pk in newest_first if pk != pks[0]]
+
+    def test_previous_link(self, personnel_client):
+        loans = LoanFactory.create_batch(3)
+        first = personnel_client.get(self.url, {"page_size": 2})
+        second = personnel_client.get(first.data["next"])
+        previous = personnel_client.get(second.data["previous"])
+
+        assert first.data["previous"] is None
+        assert second.data["next"] is None
+        assert [loan["id"] for loan in second.data["results"]] == [loans[0].pk]
+        assert previous.data["results"] == first.data["results"]
+
+    def test_invalid_cursor(self, personnel_client):
+        response = personnel_client.get(self.url, {"cursor": "garbage"})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+class TestConditionalGet:
+    def test_detail_not_modified(
+        self, customer, customer_client, django_assert_num_queries
+    ):
+        loan = LoanFactory(customer=customer)
+        url = reverse("loans:loan-status", kwargs={"pk": loan.pk})
+        first = customer_client.get(url)
+
+        with django_assert_num_queries(1):
+            cached = customer_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert first.status_code == HTTPStatus.OK
+        assert cached.status_code == HTTPStatus.NOT_MODIFIED
+        assert cached["ETag"] == first["ETag"]
+        assert "Last-Modified" not in first
+
+    def test_detail_changes_with_documents(self, customer, customer_client):
+        loan_request = LoanRequestFactory(customer=customer)
+        url = reverse("loans:request-status", kwargs={"pk": loan_request.pk})
+        etag = customer_client.get(url)["ETag"]
+
+        Document.objects.create(
+            file="documents/id.pdf", title="id", loan_request=loan_request
+        )
+        response = customer_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == HTTPStatus.OK
+        assert response["ETag"] != etag
+
+    def test_detail_changes_when_a_document_is_removed(self, customer, customer_client):
+        loan_request = LoanRequestFactory(customer=customer)
+        first, _ = [
+            Document.objects.create(
+                file=f"documents/{title}.pdf", title=title, loan_request=loan_request
+            )
+            for title in ["id", "salary"]
+        ]
+        url = reverse("loans:request-status", kwargs={"pk": loan_request.pk})
+        etag = customer_client.get(url)["ETag"]
+
+        first.delete()
+        response = customer_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == HTTPStatus.OK
+
+    def test_list_changes_with_payments(self, customer, customer_client):
+        loan = LoanFactory(customer=customer)
+        url = reverse("loans:customer-loans")
+        etag = customer_client.get(url)["ETag"]
+
+        assert customer_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.NOT_MODIFIED
+        )
+        customer_client.post(
+            reverse("loans:loan-payment", kwargs={"pk": loan.pk}),
+            {"amount_paid": "10.00"},
+        )
+        response = customer_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == HTTPStatus.OK
+        assert "Last-Modified" not in response
+
+    def test_list_validator_covers_the_page_only(self, personnel_client):
+        oldest, _, newest = LoanFactory.create_batch(3)
+        url = reverse("loans:personnel-loans")
+        etag = personnel_client.get(url, {"page_size": 1})["ETag"]
+
+        Loan.objects.filter(pk=oldest.pk).update(updated_at=timezone.now())
+        response = personnel_client.get(url, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        Loan.objects.filter(pk=newest.pk).update(updated_at=timezone.now())
+        response = personnel_client.get(url, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_list_changes_when_a_row_leaves_the_page(self, personnel_client):
+        _, _, middle, _ = LoanFactory.create_batch(4)
+        url = reverse("loans:personnel-loans")
+        params = {"status": Loan.STATUS_IN_PROGRESS, "page_size": 2}
+        etag = personnel_client.get(url, params)["ETag"]
+
+        Loan.objects.filter(pk=middle.pk).update(status=Loan.STATUS_OVERDUE)
+        response = personnel_client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == HTTPStatus.OK
+        assert middle.pk not in [loan["id"] for loan in response.data["results"]]
+
+    def test_other_customers_loan(self, customer_client):
+        loan = LoanFactory()
+        url = reverse("loans:loan-status", kwargs={"pk": loan.pk})
+
+        response = customer_client.get(url, HTTP_IF_NONE_MATCH="*")
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+class TestSparseFields:
+    def test_list_fields(
+        self, customer, customer_client, django_assert_max_num_queries
+    ):
+        loan = LoanFactory(customer=customer)
+        Document.objects.create(file="documents/a.pdf", title="a", loan=loan)
+        url = reverse("loans:customer-loans")
+
+        # The conditional request aggregate, the count and the page, but no
+        # documents query.
+        with django_assert_max_num_queries(3):
+            sparse = customer_client.get(url, {"fields": "status,amount"})
+        expanded = customer_client.get(url, {"fields": "status", "expand": "documents"})
+        full = customer_client.get(url)
+
+        assert sparse.data["results"] == [
+            {"id": loan.pk, "amount": "1000.00", "status": Loan.STATUS_IN_PROGRESS}
+        ]
+        assert [len(loan["documents"]) for loan in expanded.data["results"]] == [1]
+        assert "documents" in full.data["results"][0]
+        assert "customer" in full.data["results"][0]
+
+    def test_detail_fields(self, customer, customer_client):
+        loan_request = LoanRequestFactory(customer=customer)
+        url = reverse("loans:request-status", kwargs={"pk": loan_request.pk})
+
+        response = customer_client.get(url, {"fields": "status"})
+
+        assert response.data == {"id": loan_request.pk, "status": loan_request.status}
+
+    def test_sparse_pages_keep_their_cursor(self, personnel_client):
+        loans = LoanFactory.create_batch(3)
+        url = reverse("loans:personnel-loans")
+
+        first = personnel_client.get(
+            url, {"fields": "status", "ordering": "updated_at", "page_size": 2}
+        )
+        second = personnel_client.get(first.data["next"])
+
+        ids = [loan["id"] for loan in first.data["results"] + second.data["results"]]
+        assert ids == [loan.pk for loan in loans]
+
+    def test_unknown_fields(self, personnel_client):
+        url = reverse("loans:personnel-loans")
+
+        assert personnel_client.get(url, {"fields": "secret"}).status_code == (
+            HTTPStatus.BAD_REQUEST
+        )
+        response = personnel_client.get(url, {"fields": "id", "expand": "customer"})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+class TestLoanRequestSearch:
+    url = reverse("loans:personnel-loan-requests-search")
+
+    def test_matches_words_and_customers(self, personnel_client):
+        # Random customer details could match the search words too.
+        omar = CustomerFactory(name="Omar", username="omar", email="omar@example.com")
+        car = LoanRequestFactory(
+            purpose="New car", details="Family hatchback", customer=omar
+        )
+        LoanRequestFactory(purpose="Kitchen renovation", details="Tiles", customer=omar)
+        house = LoanRequestFactory(
+            purpose="House", details="Garden", customer__email="amira@example.com"
+        )
+
+        by_words = personnel_client.get(self.url, {"q": "car hatchback"})
+        by_email = personnel_client.get(self.url, {"q": "amira@"})
+        nothing = personnel_client.get(self.url, {"q": "car tiles"})
+
+        assert [r["id"] for r in by_words.data] == [car.pk]
+        assert [r["id"] for r in by_email.data] == [house.pk]
+        assert nothing.data == []
+
+    def test_limit_and_validation(self, personnel_client):
+        LoanRequestFactory.create_batch(3, purpose="Car")
+
+        limited = personnel_client.get(self.url, {"q": "car", "limit": 2})
+        too_short = personnel_client.get(self.url, {"q": "c"})
+
+        assert len(limited.data) == 2
+        assert too_short.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_requires_personnel(self, customer_client):
+        response = customer_client.get(self.url, {"q": "car"})
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+class TestCustomerDashboard:
+    url = reverse("loans:customer-dashboard")
+
+    def test_dashboard(self, customer, customer_client):
+        pending = LoanRequestFactory(customer=customer)
+        LoanRequestFactory(customer=customer, status=LoanRequest.STATUS_REJECTED)
+        LoanRequestFactory()
+        loan = LoanFactory(
+            customer=customer, amount=Decimal("1200.00"), interest_rate=None
+        )
+        loan.record_payment(Decimal("50.00"))
+
+        response = customer_client.get(self.url)
+
+        assert response.data["profile"]["username"] == customer.username
+        assert [r["id"] for r in response.data["requests"]] == [pending.pk]
+        (result,) = response.data["loans"]
+        assert result["total_paid"] == "50.00"
+        assert result["outstanding_balance"] == "1150.00"
+        assert result["next_payment"] == {
+            "date": (timezone.localdate() + relativedelta(months=1)).isoformat(),
+            "amount": "50.00",
+        }
+        assert response.data["counts"]["requests"][LoanRequest.STATUS_REJECTED] == 1
+        assert response.data["counts"]["loans"][Loan.STATUS_IN_PROGRESS] == 1
+
+    def test_requires_customer(self, personnel_client):
+        response = personnel_client.get(self.url)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+class TestBatchRetrieve:
+    def test_customer_gets_own_rows(
+        self, customer, customer_client, django_assert_max_num_queries
+    ):
+        own = LoanFactory.create_batch(3, customer=customer)
+        other = LoanFactory()
+        ids = [own[2].pk, other.pk, 999999, own[0].pk, own[2].pk]
+
+        with django_assert_max_num_queries(3):
+            response = customer_client.get(
+                reverse("loans:loans-batch"), {"ids": ",".join(map(str, ids))}
+            )
+
+        assert [r["id"] for r in response.data["results"]] == [own[2].pk, own[0].pk]
+        assert response.data["missing"] == [999999]
+        assert response.data["forbidden"] == [other.pk]
+
+    def test_personnel_post(self, personnel_client):
+        loan_requests = LoanRequestFactory.create_batch(2)
+        ids = [loan_request.pk for loan_request in loan_requests]
+
+        response = personnel_client.post(
+            reverse("loans:loan-requests-batch"), {"ids": ids}, format="json"
+        )
+
+        assert [r["id"] for r in response.data["results"]] == ids
+        assert response.data["missing"] == response.data["forbidden"] == []
+
+    def test_invalid_ids(self, customer_client):
+        url = reverse("loans:loans-batch")
+        assert customer_client.get(url).status_code == HTTPStatus.BAD_REQUEST
+        response = customer_client.get(url, {"ids": "1,x"})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = customer_client.get(url, {"ids": "99999999999999999999"})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+class TestPaymentImportView:
+    url = reverse("loans:payment-import")
+
+    def upload(self, client, content, name="payments.csv"):
+        return client.post(
+            self.url,
+            {"file": SimpleUploadedFile(name, content.encode())},
+            format="multipart",
+        )
+
+    def test_imports_and_reports_errors(self, personnel_client):
+        loan = LoanFactory(amount=Decimal("100.00"), interest_rate=None)
+
+        response = self.upload(
+            personnel_client, f"loan,amount_paid\n{loan.pk},40\n{loan.pk},70\n"
+        )
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.data["imported"] == 1
+        assert response.data["total_amount"] == "40.00"
+        assert response.data["errors"] == [
+            {"line": 3, "error": "The amount exceeds the remaining balance of 60.00."}
+        ]
+        assert BankBudget.get_instance().available_funds() == Decimal("40.00")
+
+    def test_ndjson_by_extension(self, personnel_client):
+        response = self.upload(personnel_client, "not json\n", name="p.ndjson")
+        assert response.data["errors"] == [{"line": 1, "error": "Malformed row."}]
+
+    def test_requires_personnel(self, customer_client):
+        response = self.upload(customer_client, "loan,amount_paid\n")
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+class TestStatusCounts:
+    url = reverse("loans:status-counts")
+
+    def test_counts_follow_transitions(
+        self, customer, personnel_client, django_assert_num_queries
+    ):
+        loan_request = LoanRequestFactory(customer=customer)
+        personnel_client.post(
+            reverse("loans:reject-loan-request", args=[loan_request.pk])
+        )
+        LoanFactory(customer=customer)
+
+        with django_assert_num_queries(1):
+            response = personnel_client.get(self.url)
+
+        assert response.data["loan_request"][LoanRequest.STATUS_PENDING_REVIEW] == 0
+        assert response.data["loan_request"][LoanRequest.STATUS_REJECTED] == 1
+        assert response.data["loan"][Loan.STATUS_IN_PROGRESS] == 1
+
+    def test_requires_personnel(self, customer_client):
+        response = customer_client.get(self.url)
+        assert response.status_code == HTTPStatus.FORBIDDEN
@@ -1,16 +1,27 @@
 from django.urls import path
 from .api.views import (
     AcceptLoanRequestView,
+    BulkAcceptLoanRequestView,
+    CustomerCacheStatsView,
+    CustomerDashboardView,
     CustomerLoanListView,
     CustomerLoanRequestListView,
     CustomerSetLoanRequestSettingsView,
+    ExportView,
     FundProviderCreateView,
     FundProviderView,
+    LoanBatchView,
+    LoanRequestBatchView,
     PersonnelLoanListView,
+    PaymentImportView,
+    PersonnelPastDueLoanListView,
+    PersonnelUpcomingMaturityLoanListView,
     PersonnelLoanRequestListView,
+    PersonnelLoanRequestSearchView,
     CustomerLoanRequestCreateView,
     RejectLoanRequestView,
     SetLoanRequestSettingsView,
+    StatusCountsView,
     RequestStatusView,
     LoanStatusView,
     LoanPaymentView,
@@ -32,7 +43,22 @@ urlpatterns = [
         PersonnelLoanRequestListView.as_view(),
         name="personnel-loan-requests",
     ),
+    path(
+        "personnel/requests/search/",
+        PersonnelLoanRequestSearchView.as_view(),
+        name="personnel-loan-requests-search",
+    ),
     path("personnel/loans/", PersonnelLoanListView.as_view(), name="personnel-loans"),
+    path(
+        "personnel/loans/upcoming/",
+        PersonnelUpcomingMaturityLoanListView.as_view(),
+        name="personnel-loans-upcoming",
+    ),
+    path(
+        "personnel/loans/past-due/",
+        PersonnelPastDueLoanListView.as_view(),
+        name="personnel-loans-past-due",
+    ),
     path(
         "personnel/requests/<int:pk>/set-settings/",
         SetLoanRequestSettingsView.as_view(),
@@ -43,11 +69,39 @@ urlpatterns = [
         AcceptLoanRequestView.as_view(),
         name="accept-loan-request",
     ),
+    path(
+        "personnel/requests/accept/",
+        BulkAcceptLoanRequestView.as_view(),
+        name="bulk-accept-loan-requests",
+    ),
     path(
         "personnel/requests/<int:pk>/reject/",
         RejectLoanRequestView.as_view(),
         name="reject-loan-request",
     ),
+    path(
+        "personnel/payments/import/",
+        PaymentImportView.as_view(),
+        name="payment-import",
+    ),
+    path(
+        "personnel/exports/<str:name>.<str:file_format>",
+        ExportView.as_view(),
+        name="export",
+    ),
+    path(
+        "personnel/cache-stats/",
+        CustomerCacheStatsView.as_view(),
+        name="customer-cache-stats",
+    ),
+    path(
+        "personnel/status-counts/",
+        StatusCountsView.as_view(),
+        name="status-counts",
+    ),
+    # Personnel and Customer Endpoints
+    path("batch/requests/", LoanRequestBatchView.as_view(), name="loan-requests-batch"),
+    path("batch/loans/", LoanBatchView.as_view(), name="loans-batch"),
     # Customer Endpoints
     path(
         "customer/requests/",
@@ -55,6 +109,11 @@ urlpatterns = [
         name="customer-loan-requests",
     ),
     path("customer/loans/", CustomerLoanListView.as_view(), name="customer-loans"),
+    path(
+        "customer/dashboard/",
+        CustomerDashboardView.as_view(),
+        name="customer-dashboard",
+    ),
     path(
         "customer/requests/create/",
         CustomerLoanRequestCreateView.as_view(),
@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
+from config import auth
+
 
 User = get_user_model()
 
@@ -105,6 +108,22 @@ class SignInSerializer(serializers.Serializer):
         return attrs
 
 
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField(trim_whitespace=False)
+
+    def validate(self, attrs):
+        payload = settings.AUTH_SIGNED_TOKENS and auth.load_token(
+            attrs["refresh"], auth.REFRESH_SALT, settings.AUTH_REFRESH_TOKEN_LIFETIME
+        )
+        user = payload and (
+            User.objects.filter(pk=payload["uid"], is_active=True).first()
+        )
+        if not user:
+            raise serializers.ValidationError(_("Invalid or expired refresh token."))
+        attrs["user"] = user
+        return attrs
+
+
 class UserDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
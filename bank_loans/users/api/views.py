@@ -1,23 +1,28 @@
-import time
-
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.generics import DestroyAPIView
+from rest_framework.permissions import IsAdminUser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from bank_loans.users import tasks
+from bank_loans.users.email_queue import get_dispatcher
 from bank_loans.users.exceptions import ValidationError
+from config import auth
 from .serializers import (
     CheckConfirmationCodeSerializer,
     EmailConfirmationSerializer,
     EmailResendConfirmationSerializer,
     PasswordResetCodeSerializer,
     PasswordResetSerializer,
+    RefreshTokenSerializer,
     SignInSerializer,
     UpdateProfileSerializer,
     UserDetailSerializer,
@@ -47,7 +52,20 @@ class SignInView(ObtainAuthToken):
 
         user_serializer = UserDetailSerializer(user)
 
-        return Response({"token": token.key, "user": user_serializer.data})
+        data = {"token": token.key, "user": user_serializer.data}
+        if settings.AUTH_SIGNED_TOKENS:
+            data.update(auth.issue_tokens(user))
+        return Response(data)
+
+
+class RefreshTokenView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request, *args, **kwargs):
+        serializer = RefreshTokenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(auth.issue_tokens(serializer.validated_data["user"]))
 
 
 class UpdateProfileView(APIView):
@@ -68,7 +86,9 @@ class LogoutView(DestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
-        request.auth.delete()
+        # Log out of every session, whichever kind of token it uses.
+        Token.objects.filter(user=request.user).delete()
+        auth.revoke_tokens(request.user.pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -91,15 +111,11 @@ class ResendConfirmationCodeView(APIView):
     def post(self, request, *args, **kwargs):
         serializer = EmailResendConfirmationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        email = serializer.validated_data.get("email")
-
-        user = User.objects.filter(email=email).first()
-
-        if user and not user.email_verified:
-            user.send_confirmation_code()
-        else:
-            time.sleep(4)
-
+        tasks.run_in_background(
+            tasks.send_confirmation_code,
+            serializer.validated_data.get("email"),
+            get_language(),
+        )
         return Response({"is_ok": True}, status=status.HTTP_200_OK)
 
 
@@ -152,15 +168,11 @@ class PasswordResetTokenObtainView(APIView):
     def post(self, request):
         serializer = PasswordResetCodeSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        email = serializer.validated_data.get("email")
-
-        user = User.objects.filter(email=email).first()
-
-        if user:
-            user.send_reset_password_code()
-        else:
-            time.sleep(4)
-
+        tasks.run_in_background(
+            tasks.send_reset_password_code,
+            serializer.validated_data.get("email"),
+            get_language(),
+        )
         return Response({"is_ok": True}, status=status.HTTP_200_OK)
 
 
@@ -189,3 +201,14 @@ class ResetPasswordView(APIView):
             return Response(
                 {"non_field_errors": [str(e)]}, status=status.HTTP_400_BAD_REQUEST
             )
+
+
+class EmailQueueStatsView(APIView):
+    """
+    Depth, outcome counters and latency of this process's email queue.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_dispatcher().stats())
@@ -0,0 +1,206 @@
+"""
+Queue of outbound emails, sent by a background thread.
+
+``enqueue`` returns immediately; the dispatcher thread sends the queued
+messages in batches over one connection of ``EMAIL_BACKEND``, which is kept
+open until the queue has been idle for ``EMAIL_QUEUE_IDLE_TIMEOUT`` seconds.
+A message that fails is retried ``EMAIL_QUEUE_MAX_ATTEMPTS`` times in all,
+``EMAIL_QUEUE_RETRY_DELAY`` seconds later, doubling each time.
+
+Every process has its own queue and metrics (see ``stats``). Queued messages
+are flushed for a few seconds at interpreter exit, but a killed process loses
+them.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+SHUTDOWN_TIMEOUT = 10
+
+
+class QueuedEmail:
+    def __init__(self, message):
+        self.message = message
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+
+class EmailDispatcher:
+    def __init__(
+        self,
+        maxsize=1000,
+        batch_size=50,
+        max_attempts=5,
+        retry_delay=2,
+        idle_timeout=30,
+    ):
+        self.queue = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.idle_timeout = idle_timeout
+        self.counters = Counter()
+        self.retrying = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_last = None
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="email-dispatcher", daemon=True
+                )
+                self.thread.start()
+
+    def enqueue(self, message):
+        """
+        Queue ``message`` (an ``EmailMessage``) for sending. Returns ``False``
+        when the queue is full.
+        """
+        self.start()
+        try:
+            self.queue.put_nowait(QueuedEmail(message))
+        except queue.Full:
+            self.count("dropped")
+            return False
+        self.count("enqueued")
+        return True
+
+    def run(self):
+        connection = None
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.idle_timeout)]
+            except queue.Empty:
+                connection = self.close(connection)
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            connection = self.send_batch(connection, batch)
+
+    def send_batch(self, connection, batch):
+        for item in batch:
+            item.attempts += 1
+            try:
+                if connection is None:
+                    connection = get_connection()
+                    connection.open()
+                connection.send_messages([item.message])
+            except Exception:
+                logger.warning(
+                    f"Sending email to {item.message.to} failed "
+                    f"(attempt {item.attempts}).",
+                    exc_info=True,
+                )
+                connection = self.close(connection)
+                self.retry(item)
+            else:
+                self.record_sent(item)
+            finally:
+                self.queue.task_done()
+        return connection
+
+    def close(self, connection):
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning("Closing the email connection failed.", exc_info=True)
+        return None
+
+    def retry(self, item):
+        if item.attempts >= self.max_attempts:
+            self.count("failed")
+            logger.error(f"Giving up on email to {item.message.to}.")
+            return
+
+        def requeue():
+            with self.lock:
+                self.retrying -= 1
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.count("dropped")
+
+        with self.lock:
+            self.retrying += 1
+        self.count("retried")
+        timer = threading.Timer(self.retry_delay * 2 ** (item.attempts - 1), requeue)
+        timer.daemon = True
+        timer.start()
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def record_sent(self, item):
+        latency = time.monotonic() - item.enqueued_at
+        with self.lock:
+            self.counters["sent"] += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.latency_last = latency
+
+    def flush(self, timeout=SHUTDOWN_TIMEOUT):
+        """
+        Wait until the queued and retrying messages are handled. Returns
+        whether they all were within ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks or self.retrying:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stats(self):
+        with self.lock:
+            sent = self.counters["sent"]
+            return {
+                "queued": self.queue.qsize(),
+                "retrying": self.retrying,
+                "enqueued": self.counters["enqueued"],
+                "sent": sent,
+                "retried": self.counters["retried"],
+                "failed": self.counters["failed"],
+                "dropped": self.counters["dropped"],
+                "latency": {
+                    "last": self.latency_last and round(self.latency_last, 3),
+                    "average": round(self.latency_total / sent, 3) if sent else None,
+                    "max": round(self.latency_max, 3),
+                },
+            }
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = EmailDispatcher(
+                maxsize=settings.EMAIL_QUEUE_SIZE,
+                batch_size=settings.EMAIL_QUEUE_BATCH_SIZE,
+                max_attempts=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+                retry_delay=settings.EMAIL_QUEUE_RETRY_DELAY,
+                idle_timeout=settings.EMAIL_QUEUE_IDLE_TIMEOUT,
+            )
+            atexit.register(_dispatcher.flush)
+        return _dispatcher
@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from bank_loans.loans.permissions import IsCustomer
+from bank_loans.users.models import User
+from config import auth
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and queries per request of authenticating and "
+        "checking the role with database tokens, cached tokens and signed "
+        "access tokens. The sample user is created in a transaction that is "
+        "rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic(), override_settings(AUTH_SIGNED_TOKENS=True):
+                self.report(options["requests"])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def report(self, requests):
+        user = User.objects.create(username="benchmark-auth", role=User.ROLE_CUSTOMER)
+        token = Token.objects.create(user=user)
+        access = auth.issue_tokens(user)["access"]
+        cases = [
+            ("database token", TokenAuthentication(), f"Token {token.key}"),
+            ("cached token", auth.BearerTokenAuthentication(), f"Bearer {token.key}"),
+            ("signed token", auth.SignedTokenAuthentication(), f"Bearer {access}"),
+        ]
+
+        self.stdout.write("authentication   requests/sec  queries/request")
+        for name, authentication, header in cases:
+            request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=header)
+            permission = IsCustomer()
+
+            def authenticate():
+                request.user, request.auth = authentication.authenticate(request)
+                permission.has_permission(request, None)
+
+            # Warm the caches, then count the queries of a steady-state request.
+            authenticate()
+            with CaptureQueriesContext(connection) as queries:
+                authenticate()
+
+            started = time.perf_counter()
+            for _ in range(requests):
+                authenticate()
+            rate = requests / (time.perf_counter() - started)
+            self.stdout.write(f"{name:<15}  {rate:>12.0f}  {len(queries):>15}")
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from bank_loans.users.utils import create_html_code_message
+from bank_loans.users.utils import create_html_message
+from bank_loans.users.utils import reset_password_texts
+from bank_loans.users.utils import verify_email_texts
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the per-email cost of rendering the confirmation and password "
+        "reset messages through the template engine and from the cached shell."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--emails", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        emails = options["emails"]
+        self.stdout.write("message               template us/email  cached us/email")
+        for texts in [verify_email_texts, reset_password_texts]:
+
+            def template_path(code):
+                return create_html_message(code, *texts())
+
+            def cached_path(code):
+                return create_html_code_message(texts, code)
+
+            if template_path("1234") != cached_path("1234"):
+                raise CommandError(f"The cached {texts.__name__} message differs.")
+            template_cost = self.cost(template_path, emails)
+            cached_cost = self.cost(cached_path, emails)
+            self.stdout.write(
+                f"{texts.__name__:<20}  {template_cost:>17.1f}  {cached_cost:>15.1f}"
+            )
+
+    def cost(self, render, emails):
+        started = time.perf_counter()
+        for i in range(emails):
+            render(f"{i % 10000:04d}")
+        return (time.perf_counter() - started) / emails * 1e6
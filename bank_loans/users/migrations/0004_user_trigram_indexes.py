@@ -0,0 +1,38 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Fuzzy matching (``%``) runs on name and username; email is matched with
+# ``icontains``, which Django compiles to ``UPPER(email::text) LIKE``.
+TRIGRAM_INDEXES = {
+    "users_user_name_trgm_idx": "name",
+    "users_user_username_trgm_idx": "username",
+    "users_user_email_trgm_idx": "(UPPER(email::text))",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, expression in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} "
+            f"ON users_user USING gin ({expression} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_user_confirmation_code_user_email_verified_and_more"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
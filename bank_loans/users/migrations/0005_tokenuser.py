@@ -0,0 +1,27 @@
+# Generated by Django 5.0.9 on 2026-10-17 02:12
+
+import django.contrib.auth.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0004_user_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TokenUser",
+            fields=[],
+            options={
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("users.user",),
+            managers=[
+                ("objects", django.contrib.auth.models.UserManager()),
+            ],
+        ),
+    ]
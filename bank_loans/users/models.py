@@ -1,6 +1,7 @@
 import random
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.db import DEFAULT_DB_ALIAS
 from django.core.validators import EmailValidator
 from django.db.models import CharField, DateTimeField, EmailField, BooleanField
 from django.utils import timezone
@@ -151,3 +152,25 @@ class User(AbstractUser):
             .first()
         )
         return recent_subscription.plan
+
+
+class TokenUser(User):
+    """
+    User carried by a signed access token or a cached token lookup (see
+    ``config.auth``): only the fields it carries are set (``id`` and ``role``,
+    plus the permission flags for cached lookups), the other fields are all
+    loaded on first access.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_token(cls, user_id, role):
+        return cls.from_db(DEFAULT_DB_ALIAS, ["id", "role"], [user_id, role])
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred.issuperset(fields):
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
@@ -1,15 +1,31 @@
+import logging
+
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives
+
+from bank_loans.users.email_queue import get_dispatcher
+
+logger = logging.getLogger(__name__)
 
 
 def send_email(subject: str, message: str, receiver, html_message: str = None):
+    """
+    Send an email, through the background queue when ``EMAIL_QUEUE_ENABLED``.
+    A full queue falls back to sending right away.
+    """
     if isinstance(receiver, str):
         receiver = [receiver]
-    send_mail(
+    email = EmailMultiAlternatives(
         subject=subject,
-        message=message,
+        body=message,
         from_email=settings.EMAIL_HOST_USER,
-        recipient_list=receiver,
-        fail_silently=False,
-        html_message=html_message,
+        to=receiver,
     )
+    if html_message:
+        email.attach_alternative(html_message, "text/html")
+
+    if settings.EMAIL_QUEUE_ENABLED:
+        if get_dispatcher().enqueue(email):
+            return
+        logger.warning("Email queue full, sending synchronously.")
+    email.send(fail_silently=False)
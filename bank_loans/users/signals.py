@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from bank_loans.users.models import TokenUser
+from bank_loans.users.models import User
+from config import auth
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    auth.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=TokenUser)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    auth.invalidate(*Token.objects.filter(user=instance).values_list("key", flat=True))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=TokenUser)
+def revoke_signed_tokens(sender, instance, created, **kwargs):
+    # set_password() keeps the raw password in _password until it is saved.
+    if not created and (instance._password is not None or not instance.is_active):
+        auth.revoke_tokens(instance.pk)
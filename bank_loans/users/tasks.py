@@ -0,0 +1,100 @@
+"""
+Background tasks of the users API, run on a small thread pool so that the
+request that triggers them returns right away.
+
+The confirmation and password reset code endpoints answer the same way, in
+the same time, whether or not the email belongs to an account; the lookup,
+the code and the email all happen here. When more than
+``USERS_TASK_QUEUE_SIZE`` tasks are waiting, new ones are dropped rather than
+piling up in memory. With ``USERS_TASKS_EAGER`` (tests) tasks run inline.
+
+The pool threads have no active language, so the views pass the language of
+the request for the emails to be written in.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db import transaction
+from django.utils import translation
+
+from bank_loans.users.exceptions import ValidationError
+from bank_loans.users.models import User
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.USERS_TASK_WORKERS,
+                thread_name_prefix="users-tasks",
+            )
+            _slots = threading.BoundedSemaphore(settings.USERS_TASK_QUEUE_SIZE)
+        return _executor, _slots
+
+
+def _run(func, *args):
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception(f"Background task {func.__name__} failed.")
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func, *args):
+    """
+    Call ``func(*args)`` on the task pool once the current transaction commits.
+    """
+    if settings.USERS_TASKS_EAGER:
+        _run(func, *args)
+        return
+
+    def submit():
+        executor, slots = _get_executor()
+        if not slots.acquire(blocking=False):
+            logger.warning(f"Task queue full, dropping {func.__name__}.")
+            return
+
+        def task():
+            try:
+                _run(func, *args)
+            finally:
+                slots.release()
+
+        executor.submit(task)
+
+    transaction.on_commit(submit)
+
+
+def send_confirmation_code(email, language):
+    with translation.override(language):
+        user = User.objects.filter(email=email, email_verified=False).first()
+        if user is None:
+            return
+        try:
+            user.send_confirmation_code()
+        except ValidationError:
+            logger.info(f"Confirmation code for user {user.pk} requested too soon.")
+
+
+def send_reset_password_code(email, language):
+    with translation.override(language):
+        user = User.objects.filter(email=email).first()
+        if user is None:
+            return
+        try:
+            user.send_reset_password_code()
+        except ValidationError:
+            logger.info(f"Password reset code for user {user.pk} requested too soon.")
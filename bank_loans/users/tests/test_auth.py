@@ -0,0 +1,198 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from bank_loans.loans.tests.factories import CustomerFactory
+from bank_loans.users.models import User
+from config import auth
+
+pytestmark = pytest.mark.django_db
+
+PROFILE_URL = reverse("users:profile")
+
+
+@pytest.fixture
+def token(customer):
+    return Token.objects.create(user=customer)
+
+
+def cached_state(token):
+    name = auth.cache_key(token.key)
+    return cache.get(f"{name}:{auth.get_version(name)}")
+
+
+@pytest.fixture
+def token_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token.key}")
+    return client
+
+
+class TestCachedTokenAuthentication:
+    def test_lookups_are_cached(
+        self, token_client, customer, django_assert_num_queries
+    ):
+        url = reverse("loans:customer-cache-stats")
+        with django_assert_num_queries(1):
+            assert token_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        with django_assert_num_queries(0):
+            assert token_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        # The shared tier alone is enough too.
+        auth.local_cache.clear()
+        with django_assert_num_queries(0):
+            assert token_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        # Other fields are loaded on demand, together.
+        with django_assert_num_queries(1):
+            assert token_client.get(PROFILE_URL).data["username"] == customer.username
+
+    def test_only_permission_fields_are_cached(self, token_client, token, customer):
+        token_client.get(PROFILE_URL)
+        assert set(cached_state(token)["user"]) == set(auth.USER_FIELDS)
+
+        # Another worker resets the password while this one's entry is warm.
+        customer.set_password("n3w-Passw0rd")
+        User.objects.filter(pk=customer.pk).update(password=customer.password)
+
+        token_client.patch(reverse("users:update-profile"), {"name": "New Name"})
+        customer.refresh_from_db()
+        assert customer.name == "New Name"
+        assert customer.check_password("n3w-Passw0rd")
+
+    def test_invalid_token(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Bearer nope")
+        assert client.get(PROFILE_URL).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_logout_invalidates(self, token_client, token):
+        token_client.get(PROFILE_URL)
+
+        response = token_client.post(reverse("users:logout"))
+
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert cached_state(token) is None
+        assert token_client.get(PROFILE_URL).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_user_changes_invalidate(self, token_client, token, customer):
+        token_client.get(PROFILE_URL)
+
+        token_client.patch(reverse("users:update-profile"), {"name": "New Name"})
+        assert token_client.get(PROFILE_URL).data["name"] == "New Name"
+
+        customer.refresh_from_db()
+        customer.apply_password_reset(customer.password_reset_token, "n3w-Passw0rd")
+        assert cached_state(token) is None
+
+        customer.role = User.ROLE_PROVIDER
+        customer.save()
+        assert token_client.get(PROFILE_URL).data["role"] == User.ROLE_PROVIDER
+
+        customer.is_active = False
+        customer.save()
+        assert token_client.get(PROFILE_URL).status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_change_during_lookup_is_not_cached(
+        self, token_client, customer, monkeypatch
+    ):
+        snapshot = auth.snapshot
+
+        def deactivate_then_snapshot(token):
+            # The user is deactivated after being read, before being cached.
+            customer.is_active = False
+            customer.save()
+            return snapshot(token)
+
+        monkeypatch.setattr(auth, "snapshot", deactivate_then_snapshot)
+        assert token_client.get(PROFILE_URL).status_code == HTTPStatus.OK
+        monkeypatch.setattr(auth, "snapshot", snapshot)
+
+        auth.local_cache.clear()
+        assert token_client.get(PROFILE_URL).status_code == HTTPStatus.UNAUTHORIZED
+
+
+class TestSignedTokens:
+    @pytest.fixture(autouse=True)
+    def _signed_tokens(self, settings):
+        settings.AUTH_SIGNED_TOKENS = True
+
+    @pytest.fixture
+    def tokens(self):
+        CustomerFactory(username="signed", password="s3cret-Passw0rd")
+        response = APIClient().post(
+            reverse("users:token-obtain-pair"),
+            {"username": "signed", "password": "s3cret-Passw0rd"},
+        )
+        return response.data
+
+    def client_for(self, access):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return client
+
+    def test_role_checks_without_queries(self, tokens, django_assert_num_queries):
+        client = self.client_for(tokens["access"])
+        url = reverse("loans:customer-cache-stats")
+
+        with django_assert_num_queries(0):
+            assert client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+        # Other fields are loaded on demand, together.
+        with django_assert_num_queries(1):
+            assert client.get(PROFILE_URL).data["username"] == "signed"
+
+    def test_invalid_and_expired(self, settings, tokens):
+        assert self.client_for(tokens["refresh"]).get(PROFILE_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        settings.AUTH_ACCESS_TOKEN_LIFETIME = -1
+        response = self.client_for(tokens["access"]).get(PROFILE_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_refresh_and_logout(self, tokens):
+        url = reverse("users:token-refresh")
+        refreshed = APIClient().post(url, {"refresh": tokens["refresh"]}).data
+        client = self.client_for(refreshed["access"])
+        assert client.get(PROFILE_URL).status_code == HTTPStatus.OK
+
+        assert client.post(reverse("users:logout")).status_code == (
+            HTTPStatus.NO_CONTENT
+        )
+
+        assert client.get(PROFILE_URL).status_code == HTTPStatus.UNAUTHORIZED
+        response = APIClient().post(url, {"refresh": refreshed["refresh"]})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Token.objects.exists()
+
+    def test_password_reset_and_deactivation_revoke(self, tokens):
+        url = reverse("users:token-refresh")
+        user = User.objects.get(username="signed")
+        user.password_reset_token = "123456"
+        user.apply_password_reset("123456", "n3w-Passw0rd")
+
+        assert self.client_for(tokens["access"]).get(PROFILE_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        response = APIClient().post(url, {"refresh": tokens["refresh"]})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        # Tokens issued since are not affected by the earlier revocation.
+        fresh = auth.issue_tokens(user)
+        assert self.client_for(fresh["access"]).get(PROFILE_URL).status_code == (
+            HTTPStatus.OK
+        )
+        user.is_active = False
+        user.save()
+        assert self.client_for(fresh["access"]).get(PROFILE_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+    def test_disabled(self, settings, tokens):
+        settings.AUTH_SIGNED_TOKENS = False
+        response = self.client_for(tokens["access"]).get(PROFILE_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
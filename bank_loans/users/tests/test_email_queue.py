@@ -0,0 +1,104 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from bank_loans.users import email_queue
+from bank_loans.users.email_queue import EmailDispatcher
+from bank_loans.users.send_email import send_email
+
+
+class FlakyBackend(EmailBackend):
+    """
+    Locmem backend failing the first ``failures`` sends.
+    """
+
+    failures = 0
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+
+    def send_messages(self, messages):
+        if FlakyBackend.failures:
+            FlakyBackend.failures -= 1
+            raise ConnectionError("Mail server unavailable.")
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def backend(settings):
+    settings.EMAIL_BACKEND = f"{__name__}.FlakyBackend"
+    FlakyBackend.failures = 0
+    FlakyBackend.opened = 0
+    return FlakyBackend
+
+
+def message(to="someone@example.com"):
+    return EmailMessage("Subject", "Body", "bank@example.com", [to])
+
+
+def test_messages_share_a_connection(backend):
+    dispatcher = EmailDispatcher(batch_size=2)
+
+    for i in range(5):
+        assert dispatcher.enqueue(message(f"user{i}@example.com"))
+    assert dispatcher.flush()
+
+    assert sorted(m.to[0] for m in mail.outbox) == [
+        f"user{i}@example.com" for i in range(5)
+    ]
+    assert backend.opened == 1
+    stats = dispatcher.stats()
+    assert (stats["queued"], stats["enqueued"], stats["sent"]) == (0, 5, 5)
+    assert stats["latency"]["max"] >= stats["latency"]["average"] >= 0
+
+
+def test_retries_with_backoff_then_gives_up(backend):
+    dispatcher = EmailDispatcher(max_attempts=3, retry_delay=0.01)
+
+    backend.failures = 2
+    dispatcher.enqueue(message())
+    assert dispatcher.flush()
+    assert len(mail.outbox) == 1
+
+    backend.failures = 3
+    dispatcher.enqueue(message())
+    assert dispatcher.flush()
+    assert len(mail.outbox) == 1
+
+    stats = dispatcher.stats()
+    assert (stats["sent"], stats["retried"], stats["failed"]) == (1, 4, 1)
+
+
+def test_full_queue_drops(backend):
+    dispatcher = EmailDispatcher(maxsize=1)
+    dispatcher.start = lambda: None  # no worker, so the queue stays full
+
+    assert dispatcher.enqueue(message())
+    assert not dispatcher.enqueue(message())
+    assert dispatcher.stats()["dropped"] == 1
+
+
+def test_send_email_uses_the_queue(settings, backend):
+    settings.EMAIL_QUEUE_ENABLED = True
+
+    send_email("Subject", "Body", "someone@example.com", html_message="<p>Body</p>")
+
+    assert email_queue.get_dispatcher().flush()
+    (sent,) = mail.outbox
+    assert sent.to == ["someone@example.com"]
+    assert sent.alternatives == [("<p>Body</p>", "text/html")]
+
+
+def test_stats_require_admin(admin_user, customer_client):
+    url = reverse("users:email-queue-stats")
+    client = APIClient()
+    client.force_authenticate(admin_user)
+
+    assert client.get(url).data["queued"] == 0
+    assert customer_client.get(url).status_code == HTTPStatus.FORBIDDEN
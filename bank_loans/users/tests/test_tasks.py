@@ -0,0 +1,77 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.urls import reverse
+from django.utils import translation
+from django.utils.translation import get_language
+from rest_framework.test import APIClient
+
+from bank_loans.users import tasks
+from bank_loans.users.models import User
+from bank_loans.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+RESEND_URL = reverse("users:resend-confirmation-code")
+RESET_URL = reverse("users:send-password-reset-url")
+
+
+@pytest.mark.parametrize("url", [RESEND_URL, RESET_URL])
+def test_unknown_email_answers_like_known(url):
+    UserFactory(email="known@example.com", email_verified=False)
+    client = APIClient()
+
+    known = client.post(url, {"email": "known@example.com"})
+    # Asking again right away is throttled silently.
+    again = client.post(url, {"email": "known@example.com"})
+    unknown = client.post(url, {"email": "unknown@example.com"})
+
+    assert known.status_code == again.status_code == unknown.status_code
+    assert known.data == again.data == unknown.data == {"is_ok": True}
+    assert [message.to for message in mail.outbox] == [["known@example.com"]]
+
+
+def test_verified_user_gets_no_confirmation_code():
+    UserFactory(email="known@example.com", email_verified=True)
+
+    response = APIClient().post(RESEND_URL, {"email": "known@example.com"})
+
+    assert response.status_code == HTTPStatus.OK
+    assert mail.outbox == []
+
+
+@pytest.mark.parametrize(
+    ("url", "method"),
+    [(RESEND_URL, "send_confirmation_code"), (RESET_URL, "send_reset_password_code")],
+)
+def test_tasks_use_the_language_of_the_request(url, method, monkeypatch):
+    UserFactory(email="known@example.com", email_verified=False)
+    calls, languages = [], []
+    monkeypatch.setattr(tasks, "run_in_background", lambda *call: calls.append(call))
+    monkeypatch.setattr(User, method, lambda user: languages.append(get_language()))
+
+    # The request leaves its language active; restore ours afterwards.
+    with translation.override("en"):
+        APIClient().post(url, {"email": "known@example.com"}, HTTP_ACCEPT_LANGUAGE="fr")
+        # Run the task in another language, like the pool threads do.
+        with translation.override("en"):
+            for func, *args in calls:
+                func(*args)
+
+    assert languages == ["fr"]
+
+
+def test_tasks_run_on_the_pool_after_commit(
+    settings, django_capture_on_commit_callbacks
+):
+    settings.USERS_TASKS_EAGER = False
+    done = threading.Event()
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        tasks.run_in_background(done.set)
+        assert not done.is_set()
+
+    assert len(callbacks) == 1
+    assert done.wait(timeout=5)
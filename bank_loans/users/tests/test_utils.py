@@ -0,0 +1,37 @@
+import pytest
+from django.utils import translation
+
+from bank_loans.users import utils
+
+
+@pytest.mark.parametrize(
+    ("render", "texts"),
+    [
+        (utils.create_html_verify_email_message, utils.verify_email_texts),
+        (utils.create_html_reset_password_message, utils.reset_password_texts),
+    ],
+)
+def test_cached_message_matches_template(render, texts):
+    for code in ["0042", "9999", "<b>&"]:
+        assert render(code) == utils.create_html_message(code, *texts())
+    assert "&lt;b&gt;&amp;" in render("<b>&")
+
+
+def test_shell_is_rendered_once_per_language():
+    utils._render_shell.cache_clear()
+
+    utils.create_html_verify_email_message("1111")
+    utils.create_html_verify_email_message("2222")
+    with translation.override("fr"):
+        utils.create_html_verify_email_message("3333")
+
+    info = utils._render_shell.cache_info()
+    assert (info.misses, info.hits) == (2, 1)
+
+
+def test_debug_renders_every_time(settings):
+    settings.DEBUG = True
+    utils._render_shell.cache_clear()
+
+    assert "1234" in utils.create_html_reset_password_message("1234")
+    assert utils._render_shell.cache_info().misses == 0
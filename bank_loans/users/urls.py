@@ -3,7 +3,9 @@ from django.urls import path
 from .api.views import (
     CheckConfirmationCodeView,
     ConfirmEmailView,
+    EmailQueueStatsView,
     PasswordResetTokenObtainView,
+    RefreshTokenView,
     RegisterView,
     ResendConfirmationCodeView,
     ResetPasswordView,
@@ -16,6 +18,7 @@ from .api.views import (
 app_name = "users"
 urlpatterns = [
     path("login/", SignInView.as_view(), name="token-obtain-pair"),
+    path("token/refresh/", RefreshTokenView.as_view(), name="token-refresh"),
     path("profile/", UserRetrieveView.as_view(), name="profile"),
     path("update-profile/", UpdateProfileView.as_view(), name="update-profile"),
     path("logout/", LogoutView.as_view(), name="logout"),
@@ -37,4 +40,5 @@ urlpatterns = [
         name="check-confirmation-code",
     ),
     path("password-reset-confirm/", ResetPasswordView.as_view(), name="password-reset"),
+    path("email-queue/stats/", EmailQueueStatsView.as_view(), name="email-queue-stats"),
 ]
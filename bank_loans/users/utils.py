@@ -1,6 +1,14 @@
+from functools import lru_cache
+
+from django.conf import settings
 from django.template.loader import render_to_string
+from django.utils.html import escape
+from django.utils.translation import get_language
 from django.utils.translation import gettext as _
 
+# Stands for the code in the cached messages; escaping leaves it unchanged.
+CODE_PLACEHOLDER = "__EMAIL_CODE__"
+
 
 def get_first_matching_attr(obj, *attrs, default=None):
     for attr in attrs:
@@ -34,7 +42,24 @@ def create_html_message(code, subject, message_text, footer_text):
     return render_to_string("emails/user-auth-base.html", context)
 
 
-def create_html_verify_email_message(code):
+@lru_cache(maxsize=64)
+def _render_shell(texts, language):
+    return create_html_message(CODE_PLACEHOLDER, *texts())
+
+
+def create_html_code_message(texts, code):
+    """
+    Render the message of ``texts`` (a function returning its subject, text and
+    footer) for ``code``. Outside of DEBUG the message is rendered once per
+    language and the escaped code substituted into it.
+    """
+    if settings.DEBUG:
+        return create_html_message(code, *texts())
+    shell = _render_shell(texts, get_language())
+    return shell.replace(CODE_PLACEHOLDER, escape(code))
+
+
+def verify_email_texts():
     message = _(
         "Please use the code below to confirm your email address and complete your registration."
     )
@@ -42,23 +67,21 @@ def create_html_verify_email_message(code):
         "If you didn't request this confirmation code, you can ignore this email. "
         "Someone else might have entered your email address by mistake."
     )
-    return create_html_message(
-        code,
-        _("Confirm Your Email"),
-        message,
-        footer,
-    )
+    return _("Confirm Your Email"), message, footer
 
 
-def create_html_reset_password_message(code):
+def reset_password_texts():
     message = _("Please use the code below to reset your password.")
     footer = _(
         "If you didn't request a password reset, you can ignore this email. "
         "Someone else might have entered your email address by mistake."
     )
-    return create_html_message(
-        code,
-        _("Reset Your Password"),
-        message,
-        footer,
-    )
+    return _("Reset Your Password"), message, footer
+
+
+def create_html_verify_email_message(code):
+    return create_html_code_message(verify_email_texts, code)
+
+
+def create_html_reset_password_message(code):
+    return create_html_code_message(reset_password_texts, code)
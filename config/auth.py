@@ -1,5 +1,258 @@
+"""
+Bearer token authentication with a two-tier cache of token -> user snapshots.
+
+Lookups go to a small in-process LRU first, then to the default cache (Redis
+in production), and only then to the database. Every token has a version in
+the default cache that is part of the key of its shared entry; it is read
+before the database lookup and bumped when the token is deleted (logout) or
+its user is saved (profile, role or password changes, see
+``bank_loans.users.signals``). A snapshot read just before such a change is
+thus stored under the old version, where nothing reads it. The in-process
+tier is not versioned and the other workers' are not reached by invalidation,
+so it keeps entries for a few seconds only
+(``AUTH_TOKEN_LOCAL_CACHE_TIMEOUT``).
+
+With ``AUTH_SIGNED_TOKENS``, sign in also issues signed, expiring access and
+refresh tokens (``django.core.signing``, keyed with ``SECRET_KEY``) carrying
+the user id and role. ``SignedTokenAuthentication`` checks them without any
+database access; a role change only reaches them when they are refreshed.
+Logging out, a password change and deactivation revoke every signed token
+issued to the user so far, through a timestamp in the default cache.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db import transaction
+from rest_framework.authentication import BaseAuthentication
 from rest_framework.authentication import TokenAuthentication
+from rest_framework.authentication import get_authorization_header
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from bank_loans.users.models import TokenUser
+
+PREFIX = "auth:token"
+REVOKED_PREFIX = "auth:revoked"
+ACCESS_SALT = "config.auth.access"
+REFRESH_SALT = "config.auth.refresh"
+USER_FIELDS = ["id", "role", "is_active", "is_staff", "is_superuser"]
+
+
+class LocalCache:
+    """
+    Thread-safe LRU dict whose entries expire after a timeout.
+    """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        if timeout <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > settings.AUTH_TOKEN_LOCAL_CACHE_SIZE:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalCache()
+
+
+def cache_key(token_key):
+    return f"{PREFIX}:{hashlib.sha256(token_key.encode()).hexdigest()}"
+
+
+def _version_key(name):
+    return f"{name}:version"
+
+
+def get_version(name):
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def _bump(name):
+    key = _version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def snapshot(token):
+    """
+    Return the cacheable state of ``token`` and its user, as plain values so
+    that every request gets its own instances. Only the user fields that
+    authentication and permission checks read are kept.
+    """
+    user = token.user
+    return {
+        "token": {"key": token.key, "created": token.created},
+        "user": {name: getattr(user, name) for name in USER_FIELDS},
+    }
+
+
+def restore(state):
+    """
+    Rebuild the token and user of ``snapshot``. The user is a ``TokenUser``
+    whose other fields are loaded on first access, so saving it only writes
+    the fields of the snapshot and those set since.
+    """
+    # ``from_db`` takes the values in field order.
+    names = [
+        field.attname
+        for field in TokenUser._meta.concrete_fields
+        if field.attname in USER_FIELDS and field.attname in state["user"]
+    ]
+    user = TokenUser.from_db(
+        DEFAULT_DB_ALIAS, names, [state["user"][name] for name in names]
+    )
+    token = Token.from_db(
+        DEFAULT_DB_ALIAS,
+        ["key", "user_id", "created"],
+        [state["token"]["key"], user.pk, state["token"]["created"]],
+    )
+    token.user = user
+    return token
+
+
+def invalidate(*token_keys):
+    """
+    Drop the cached lookups of ``token_keys``, right away and again once the
+    current transaction commits.
+    """
+    names = [cache_key(token_key) for token_key in token_keys]
+    if not names:
+        return
+
+    def drop():
+        for name in names:
+            _bump(name)
+            local_cache.delete(name)
+
+    drop()
+    transaction.on_commit(drop)
 
 
 class BearerTokenAuthentication(TokenAuthentication):
     keyword = "Bearer"
+
+    def authenticate_credentials(self, key):
+        name = cache_key(key)
+        state = local_cache.get(name)
+        if state is None:
+            shared_name = f"{name}:{get_version(name)}"
+            state = cache.get(shared_name)
+            if state is None:
+                user, token = super().authenticate_credentials(key)
+                state = snapshot(token)
+                cache.set(shared_name, state, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+            local_cache.set(name, state, settings.AUTH_TOKEN_LOCAL_CACHE_TIMEOUT)
+        token = restore(state)
+        return token.user, token
+
+
+def issue_tokens(user):
+    """
+    Return a signed access and refresh token for ``user``.
+    """
+    payload = {"uid": user.pk, "role": user.role, "iat": time.time()}
+    return {
+        "access": signing.dumps(payload, salt=ACCESS_SALT),
+        "refresh": signing.dumps(payload, salt=REFRESH_SALT),
+    }
+
+
+def load_token(value, salt, max_age):
+    """
+    Return the payload of a signed token, or ``None`` when it is forged,
+    expired or revoked.
+    """
+    try:
+        payload = signing.loads(value, salt=salt, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    revoked_at = cache.get(f"{REVOKED_PREFIX}:{payload['uid']}")
+    if revoked_at is not None and payload["iat"] <= revoked_at:
+        return None
+    return payload
+
+
+def revoke_tokens(user_id):
+    """
+    Revoke the signed tokens issued to ``user_id`` up to now, and again once
+    the current transaction commits.
+    """
+
+    def revoke():
+        cache.set(
+            f"{REVOKED_PREFIX}:{user_id}",
+            time.time(),
+            settings.AUTH_REFRESH_TOKEN_LIFETIME,
+        )
+
+    revoke()
+    transaction.on_commit(revoke)
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authenticate ``Bearer`` signed access tokens as a ``TokenUser``. Database
+    tokens are left to ``BearerTokenAuthentication``.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        if not settings.AUTH_SIGNED_TOKENS:
+            return None
+        auth = get_authorization_header(request).split()
+        if len(auth) != 2 or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        try:
+            value = auth[1].decode()
+        except UnicodeError:
+            return None
+        if ":" not in value:
+            return None
+
+        payload = load_token(value, ACCESS_SALT, settings.AUTH_ACCESS_TOKEN_LIFETIME)
+        if payload is None:
+            raise AuthenticationFailed("Invalid or expired token.")
+        return TokenUser.from_token(payload["uid"], payload["role"]), payload
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -69,6 +69,7 @@ DJANGO_APPS = [
     "django_filters",
     # "django.contrib.humanize", # Handy template tags
     "django.contrib.admin",
+    "django.contrib.postgres",
     "django.forms",
 ]
 THIRD_PARTY_APPS = [
@@ -266,9 +267,14 @@ REDIS_URL = env("REDIS_URL", default="redis://redis:6379/0")
 # -------------------------------------------------------------------------------
 # django-rest-framework - https://www.django-rest-framework.org/api-guide/settings/
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": ("config.auth.BearerTokenAuthentication",),
+    "DEFAULT_AUTHENTICATION_CLASSES": (
+        "config.auth.SignedTokenAuthentication",
+        "config.auth.BearerTokenAuthentication",
+    ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_PAGINATION_CLASS": "bank_loans.loans.pagination.KeysetPagination",
+    "PAGE_SIZE": 50,
 }
 
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
@@ -286,3 +292,56 @@ SPECTACULAR_SETTINGS = {
 # Your stuff...
 # ------------------------------------------------------------------------------
 OTP_EXPIRATION_TIME = env("DJANGO_OTP_EXPIRATION_TIME", default=300)
+# Seconds between two bank budget ledger compactions.
+BUDGET_LEDGER_COMPACTION_INTERVAL = env.int(
+    "DJANGO_BUDGET_LEDGER_COMPACTION_INTERVAL", default=60
+)
+# Seconds a ledger compaction waits for the transactions running when it starts
+# (any of them may still commit ledger entries) before giving up until the next.
+BUDGET_LEDGER_COMPACTION_TIMEOUT = env.int(
+    "DJANGO_BUDGET_LEDGER_COMPACTION_TIMEOUT", default=10
+)
+# Seconds between two loan status sweeps (overdue / fully paid detection).
+LOAN_STATUS_SWEEP_INTERVAL = env.int("DJANGO_LOAN_STATUS_SWEEP_INTERVAL", default=3600)
+# Seconds a customer's cached loan list responses live (they are also dropped
+# as soon as one of the customer's loans, requests, payments or documents
+# changes).
+CUSTOMER_CACHE_TIMEOUT = env.int("DJANGO_CUSTOMER_CACHE_TIMEOUT", default=300)
+# Above this many rows, list and admin counts use the PostgreSQL planner's
+# estimate instead of COUNT(*).
+APPROXIMATE_COUNT_THRESHOLD = env.int(
+    "DJANGO_APPROXIMATE_COUNT_THRESHOLD", default=10000
+)
+# Seconds an API token's user is cached for in the default cache, and in the
+# memory of each process (which other processes cannot invalidate, keep it
+# short); and the number of tokens kept in memory.
+AUTH_TOKEN_CACHE_TIMEOUT = env.int("DJANGO_AUTH_TOKEN_CACHE_TIMEOUT", default=300)
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = env.int(
+    "DJANGO_AUTH_TOKEN_LOCAL_CACHE_TIMEOUT", default=5
+)
+AUTH_TOKEN_LOCAL_CACHE_SIZE = env.int(
+    "DJANGO_AUTH_TOKEN_LOCAL_CACHE_SIZE", default=1024
+)
+# Also issue signed access/refresh tokens at sign in, which authenticate
+# without database access; their lifetimes in seconds.
+AUTH_SIGNED_TOKENS = env.bool("DJANGO_AUTH_SIGNED_TOKENS", default=False)
+AUTH_ACCESS_TOKEN_LIFETIME = env.int("DJANGO_AUTH_ACCESS_TOKEN_LIFETIME", default=300)
+AUTH_REFRESH_TOKEN_LIFETIME = env.int(
+    "DJANGO_AUTH_REFRESH_TOKEN_LIFETIME", default=7 * 24 * 3600
+)
+# Threads sending the confirmation and password reset codes in the background,
+# and how many tasks may wait for them before new ones are dropped.
+USERS_TASK_WORKERS = env.int("DJANGO_USERS_TASK_WORKERS", default=2)
+USERS_TASK_QUEUE_SIZE = env.int("DJANGO_USERS_TASK_QUEUE_SIZE", default=1000)
+# Run those tasks inline instead.
+USERS_TASKS_EAGER = env.bool("DJANGO_USERS_TASKS_EAGER", default=False)
+# Send emails from a background queue (see bank_loans.users.email_queue): its
+# size, how many messages are sent per batch, attempts per message, the first
+# retry delay in seconds (doubled on every attempt), and the seconds of
+# inactivity after which the connection to the mail server is closed.
+EMAIL_QUEUE_ENABLED = env.bool("DJANGO_EMAIL_QUEUE_ENABLED", default=True)
+EMAIL_QUEUE_SIZE = env.int("DJANGO_EMAIL_QUEUE_SIZE", default=1000)
+EMAIL_QUEUE_BATCH_SIZE = env.int("DJANGO_EMAIL_QUEUE_BATCH_SIZE", default=50)
+EMAIL_QUEUE_MAX_ATTEMPTS = env.int("DJANGO_EMAIL_QUEUE_MAX_ATTEMPTS", default=5)
+EMAIL_QUEUE_RETRY_DELAY = env.int("DJANGO_EMAIL_QUEUE_RETRY_DELAY", default=2)
+EMAIL_QUEUE_IDLE_TIMEOUT = env.int("DJANGO_EMAIL_QUEUE_IDLE_TIMEOUT", default=30)
@@ -3,6 +3,7 @@ from .base import *  # noqa: F401
 from .base import DATABASES
 from .base import REDIS_URL
 from .base import SPECTACULAR_SETTINGS
+from .base import TEMPLATES
 from .base import env
 
 # GENERAL
@@ -69,6 +70,21 @@ STORAGES = {
     },
 }
 
+# TEMPLATES
+# ------------------------------------------------------------------------------
+# https://docs.djangoproject.com/en/dev/ref/templates/api/#django.template.loaders.cached.Loader
+# Compiled templates are kept in memory, never re-read from disk.
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+
 # EMAIL
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#default-from-email
@@ -25,6 +25,8 @@ PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#email-backend
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+# Send right away, so that mail.outbox is filled when the request returns.
+EMAIL_QUEUE_ENABLED = False
 
 # DEBUGGING FOR TEMPLATES
 # ------------------------------------------------------------------------------
@@ -35,6 +37,11 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 # https://docs.djangoproject.com/en/dev/ref/settings/#media-url
 MEDIA_URL = "http://media.testserver"
 
+# USERS
+# ------------------------------------------------------------------------------
+# Send the confirmation and password reset codes inline.
+USERS_TASKS_EAGER = True
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",